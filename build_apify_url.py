@@ -6,13 +6,17 @@ This script takes a search ID that you extracted manually from Apollo.io
 and builds the complete URL for Apify scraping.
 
 Usage:
-    python build_apify_url.py
+    python build_apify_url.py [SEARCH_ID]
+    echo SEARCH_ID | python build_apify_url.py > url.txt
 
-You'll be prompted to enter your search ID.
+You'll be prompted to enter your search ID when running interactively.
+When the ID comes from argv or a pipe, only the URL is printed.
 """
 
 import os
-from urllib.parse import quote
+import sys
+from pathlib import Path
+from urllib.parse import quote, urlencode
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -25,6 +29,64 @@ JOB_TITLES = [
     "Director of Sales", "Sales Manager"
 ]
 
+# Job titles never change at runtime, so encode the query fragment once
+_TITLE_PARAMS = "&" + urlencode(
+    [("personTitles[]", title) for title in JOB_TITLES], quote_via=quote, safe="[]"
+)
+
+# Static console output, joined once so each block is a single write
+_INSTRUCTIONS = "\n".join([
+    "🔗 Apollo Search ID → Apify URL Builder",
+    "=" * 50,
+    "",
+    "📋 Instructions:",
+    "1. Go to Apollo.io in your regular browser",
+    "2. Navigate to People search",
+    "3. Click 'Companies and Lookalikes' → 'Include / exclude list of companies'",
+    "4. Paste your domain list and click 'Save and Search'",
+    "5. Copy the qOrganizationSearchListId from the URL",
+    "6. Paste it below",
+    "",
+    "=" * 50,
+    "",
+])
+
+_RESULTS_TOP = "\n".join([
+    "",
+    "🎉 SUCCESS! Apify URL Built",
+    "=" * 60,
+    "",
+])
+
+_RESULTS_TITLES = f"✅ Job titles: {', '.join(JOB_TITLES)}\n"
+
+_RESULTS_MIDDLE = "\n".join([
+    "",
+    "📋 APIFY MANUAL INSTRUCTIONS:",
+    "-" * 40,
+    "1. Go to: https://console.apify.com/",
+    "2. Search for 'Apollo.io Scraper' or use actor ID: jljBwyyQakqrL1wae",
+    "3. Click 'Try for free' or 'Start'",
+    "4. In the input configuration, paste this URL:",
+    "",
+    "🔗 APIFY URL:",
+    "-" * 20,
+    "",
+])
+
+_RESULTS_BOTTOM = "\n".join([
+    "-" * 20,
+    "",
+    "5. Set 'Total Records' to: 200",
+    "6. Set 'File Name' to: Apollo_Prospects",
+    "7. Click 'Start' to run the scraper",
+    "8. Download results when complete",
+    "",
+    "💾 URL also saved to: apify_url.txt",
+    "🎯 Ready for Apify execution!",
+    "",
+])
+
 def url_encode_job_titles(titles):
     """URL encode job titles for Apollo search"""
     return [quote(title) for title in titles]
@@ -34,48 +96,44 @@ def build_apify_url(search_id):
     
     # Validate search ID
     if not search_id or len(search_id) < 10:
-        print("❌ Invalid search ID. Please check and try again.")
+        print("❌ Invalid search ID. Please check and try again.", file=sys.stderr)
         return None
     
-    # Base Apollo URL with search ID
-    base_url = (
+    # Apollo URL with search ID and pre-encoded job titles
+    return (
         "https://app.apollo.io/#/people?"
         "page=1&sortAscending=false&sortByField=%5Bnone%5D"
-        f"&qOrganizationSearchListId={search_id}"
+        f"&qOrganizationSearchListId={search_id}{_TITLE_PARAMS}"
     )
-    
-    # Add job titles
-    encoded_titles = url_encode_job_titles(JOB_TITLES)
-    title_params = "".join(f"&personTitles[]={title}" for title in encoded_titles)
-    
-    final_url = base_url + title_params
-    
-    return final_url
+
+def read_search_id():
+    """Read search ID from argv, piped stdin, or an interactive prompt"""
+    if len(sys.argv) > 1:
+        return sys.argv[1].strip()
+    
+    if not sys.stdin.isatty():
+        return sys.stdin.readline().strip()
+    
+    # Prompt on stderr so a piped stdout only ever carries the URL
+    sys.stderr.write(_INSTRUCTIONS)
+    sys.stderr.write("\n🔍 Enter your Apollo search ID: ")
+    sys.stderr.flush()
+    return sys.stdin.readline().strip()
 
 def main():
     """Main function"""
-    print("🔗 Apollo Search ID → Apify URL Builder")
-    print("=" * 50)
-    
-    print("\n📋 Instructions:")
-    print("1. Go to Apollo.io in your regular browser")
-    print("2. Navigate to People search")
-    print("3. Click 'Companies and Lookalikes' → 'Include / exclude list of companies'")
-    print("4. Paste your domain list and click 'Save and Search'")
-    print("5. Copy the qOrganizationSearchListId from the URL")
-    print("6. Paste it below")
-    
-    print("\n" + "=" * 50)
+    interactive = sys.stdin.isatty() and sys.stdout.isatty() and len(sys.argv) <= 1
     
     # Get search ID from user
-    search_id = input("\n🔍 Enter your Apollo search ID: ").strip()
+    search_id = read_search_id()
     
     if not search_id:
-        print("❌ No search ID provided. Exiting.")
+        print("❌ No search ID provided. Exiting.", file=sys.stderr)
         return
     
-    print(f"\n⚙️ Processing search ID: {search_id}")
-    print(f"📊 Job titles to include: {len(JOB_TITLES)} titles")
+    if interactive:
+        print(f"\n⚙️ Processing search ID: {search_id}\n"
+              f"📊 Job titles to include: {len(JOB_TITLES)} titles")
     
     # Build the URL
     apify_url = build_apify_url(search_id)
@@ -83,36 +141,24 @@ def main():
     if not apify_url:
         return
     
-    # Display results
-    print("\n🎉 SUCCESS! Apify URL Built")
-    print("=" * 60)
-    print(f"✅ Search ID: {search_id}")
-    print(f"✅ Job titles: {', '.join(JOB_TITLES)}")
-    print(f"✅ URL length: {len(apify_url)} characters")
-    
-    print(f"\n📋 APIFY MANUAL INSTRUCTIONS:")
-    print("-" * 40)
-    print("1. Go to: https://console.apify.com/")
-    print("2. Search for 'Apollo.io Scraper' or use actor ID: jljBwyyQakqrL1wae")
-    print("3. Click 'Try for free' or 'Start'")
-    print("4. In the input configuration, paste this URL:")
-    
-    print(f"\n🔗 APIFY URL:")
-    print("-" * 20)
-    print(apify_url)
-    print("-" * 20)
-    
-    print(f"\n5. Set 'Total Records' to: 200")
-    print("6. Set 'File Name' to: Apollo_Prospects")
-    print("7. Click 'Start' to run the scraper")
-    print("8. Download results when complete")
-    
     # Save to file for easy copying
-    with open("apify_url.txt", "w") as f:
-        f.write(apify_url)
+    Path("apify_url.txt").write_text(apify_url, encoding="utf-8")
+    
+    # Scripted use only needs the URL itself
+    if not interactive:
+        sys.stdout.write(apify_url + "\n")
+        return
     
-    print(f"\n💾 URL also saved to: apify_url.txt")
-    print("🎯 Ready for Apify execution!")
+    # Display results
+    sys.stdout.write(
+        f"{_RESULTS_TOP}"
+        f"✅ Search ID: {search_id}\n"
+        f"{_RESULTS_TITLES}"
+        f"✅ URL length: {len(apify_url)} characters\n"
+        f"{_RESULTS_MIDDLE}"
+        f"{apify_url}\n"
+        f"{_RESULTS_BOTTOM}"
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
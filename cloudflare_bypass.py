@@ -5,13 +5,52 @@ Try multiple strategies to get past Cloudflare protection
 
 import asyncio
 import time
-from browser_use import Agent
-from browser_use.llm.openai.chat import ChatOpenAI
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+async def _run_strategy(i, strategy, llm):
+    """Run a single bypass strategy, returning it on success or None on failure"""
+    print(f"\n🧪 Testing Strategy {i}: {strategy['name']}")
+    
+    try:
+        from browser_use import Agent
+        from browser_use.browser.profile import BrowserProfile
+        
+        profile_config = {
+            "headless": False,
+            "wait_for_network_idle_page_load_time": strategy.get("wait_time", 30),
+            "allowed_domains": ["*.apollo.io"],
+            "args": strategy.get("args", []),
+        }
+        
+        if "channel" in strategy:
+            profile_config["channel"] = strategy["channel"]
+        if "stealth" in strategy:
+            profile_config["stealth"] = strategy["stealth"]
+            
+        profile = BrowserProfile(**profile_config)
+        
+        agent = Agent(
+            task=f"Navigate to https://app.apollo.io and wait {strategy.get('wait_time', 30)} seconds. If you see the Apollo interface (not Cloudflare), return 'SUCCESS'. If you see Cloudflare, return 'BLOCKED'.",
+            browser_profile=profile,
+            llm=llm,
+        )
+        
+        result = await agent.run(max_steps=3)
+        
+        if "SUCCESS" in str(result).upper():
+            print(f"✅ Strategy {i} ({strategy['name']}) WORKED!")
+            return strategy
+        else:
+            print(f"❌ Strategy {i} ({strategy['name']}) failed: {result}")
+            
+    except Exception as e:
+        print(f"❌ Strategy {i} error: {e}")
+    
+    return None
+
 async def test_cloudflare_bypass():
     """Test different approaches to bypass Cloudflare"""
     
@@ -35,50 +74,29 @@ async def test_cloudflare_bypass():
         }
     ]
     
+    from browser_use.llm.openai.chat import ChatOpenAI
+    
     llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
     
-    for i, strategy in enumerate(strategies, 1):
-        print(f"\n🧪 Testing Strategy {i}: {strategy['name']}")
-        print("-" * 50)
-        
-        try:
-            from browser_use.browser.profile import BrowserProfile
-            
-            profile_config = {
-                "headless": False,
-                "wait_for_network_idle_page_load_time": strategy.get("wait_time", 30),
-                "allowed_domains": ["*.apollo.io"],
-                "args": strategy.get("args", []),
-            }
-            
-            if "channel" in strategy:
-                profile_config["channel"] = strategy["channel"]
-            if "stealth" in strategy:
-                profile_config["stealth"] = strategy["stealth"]
-                
-            profile = BrowserProfile(**profile_config)
-            
-            agent = Agent(
-                task=f"Navigate to https://app.apollo.io and wait {strategy.get('wait_time', 30)} seconds. If you see the Apollo interface (not Cloudflare), return 'SUCCESS'. If you see Cloudflare, return 'BLOCKED'.",
-                browser_profile=profile,
-                llm=llm,
-            )
-            
-            result = await agent.run(max_steps=3)
-            
-            if "SUCCESS" in str(result).upper():
-                print(f"✅ Strategy {i} ({strategy['name']}) WORKED!")
-                return strategy
-            else:
-                print(f"❌ Strategy {i} ({strategy['name']}) failed: {result}")
-                
-        except Exception as e:
-            print(f"❌ Strategy {i} error: {e}")
-            
-        # Wait between attempts
-        if i < len(strategies):
-            print("⏳ Waiting 60 seconds before next attempt...")
-            await asyncio.sleep(60)
+    # Each strategy runs in its own isolated browser, so race them concurrently
+    tasks = [
+        asyncio.create_task(_run_strategy(i, strategy, llm))
+        for i, strategy in enumerate(strategies, 1)
+    ]
+    
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                strategy = task.result()
+                if strategy:
+                    return strategy
+    finally:
+        # Cancel losing strategies and let their browsers shut down
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     print("\n❌ All strategies failed. Consider:")
     print("1. Using VPN/different IP")
@@ -4,47 +4,90 @@ Following browser-use best practices for security and maintainability
 """
 
 import os
-import json
+import re
+import logging
+import fnmatch
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
-from dotenv import load_dotenv
-import structlog
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field, fields, asdict
+from dotenv import dotenv_values, find_dotenv
 
 from exceptions import ConfigurationError, EnvironmentError
+from serialization import json_dumps, json_loads
+
+# .env values last applied to os.environ, and whether the file must be re-read
+_DOTENV_CACHE: Dict[str, str] = {}
+_DOTENV_STALE = True
+
+
+def _load_dotenv_cache() -> None:
+    """
+    Parse .env and apply it to os.environ
+    
+    Variables set outside .env are never overridden; values this module applied
+    from an earlier read are, so a re-read picks up edits to the file.
+    """
+    global _DOTENV_CACHE, _DOTENV_STALE
+    dotenv_path = find_dotenv()
+    parsed = dotenv_values(dotenv_path) if dotenv_path else {}
+    parsed = {key: value for key, value in parsed.items() if value is not None}
+    for key, value in parsed.items():
+        current = os.environ.get(key)
+        if current is None or current == _DOTENV_CACHE.get(key):
+            os.environ[key] = value
+    _DOTENV_CACHE = parsed
+    _DOTENV_STALE = False
+
+
+def invalidate_dotenv_cache() -> None:
+    """Force the next reload_config() to re-read .env"""
+    global _DOTENV_STALE
+    _DOTENV_STALE = True
+
+
+# Load environment variables once per process (module-level, so child processes
+# still read their own .env)
+_load_dotenv_cache()
 
-# Load environment variables
-load_dotenv()
 try:
     import structlog
     logger = structlog.get_logger("apollo.config")
 except ImportError:
-    import logging
-    
     class LoggerWrapper:
         def __init__(self, name):
             self._logger = logging.getLogger(name)
             logging.basicConfig(level=logging.INFO)
             
+        def isEnabledFor(self, level):
+            return self._logger.isEnabledFor(level)
+            
         def info(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.INFO):
+                return
             if kwargs:
                 self._logger.info(f"{message} {kwargs}")
             else:
                 self._logger.info(message)
                 
         def debug(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.DEBUG):
+                return
             if kwargs:
                 self._logger.debug(f"{message} {kwargs}")
             else:
                 self._logger.debug(message)
                 
         def warning(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.WARNING):
+                return
             if kwargs:
                 self._logger.warning(f"{message} {kwargs}")
             else:
                 self._logger.warning(message)
                 
         def error(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.ERROR):
+                return
             if kwargs:
                 self._logger.error(f"{message} {kwargs}")
             else:
@@ -52,8 +95,64 @@ except ImportError:
     
     logger = LoggerWrapper("apollo.config")
 
+def _debug_enabled() -> bool:
+    """Check whether debug output is wanted (APOLLO_LOG_LEVEL or the stdlib logger level)"""
+    if os.getenv("APOLLO_LOG_LEVEL", "").upper() == "DEBUG":
+        return True
+    return logging.getLogger("apollo.config").isEnabledFor(logging.DEBUG)
+
+
+# BrowserConfiguration fields that feed into get_browser_args()
+_BROWSER_ARGS_FIELDS = frozenset(("user_agent", "disable_images", "disable_css", "disable_fonts"))
+
+# Fields kept out of the saved config file
+_UNPERSISTED_FIELDS = frozenset(("user_agent",))
+
+
+def _persisted_fields(items) -> Dict[str, Any]:
+    """asdict() factory that drops private caches and unpersisted fields"""
+    return {
+        key: value for key, value in items
+        if not key.startswith("_") and key not in _UNPERSISTED_FIELDS
+    }
+
+
+_TRUE_VALUES = frozenset(("true", "1", "yes", "on"))
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in _TRUE_VALUES
+
 
-@dataclass
+# Environment variable -> (section, key, converter)
+_ENV_MAPPINGS = (
+    # Browser configuration
+    ("APOLLO_HEADLESS", "browser", "headless", _parse_bool),
+    ("APOLLO_STEALTH", "browser", "stealth", _parse_bool),
+    ("APOLLO_VIEWPORT_WIDTH", "browser", "viewport_width", int),
+    ("APOLLO_VIEWPORT_HEIGHT", "browser", "viewport_height", int),
+    
+    # Apollo configuration
+    ("APOLLO_MAX_CONTACTS", "apollo", "max_contacts", int),
+    ("APOLLO_REQUEST_DELAY", "apollo", "request_delay", float),
+    ("APOLLO_MAX_RETRIES", "apollo", "max_retries", int),
+    
+    # Apify configuration
+    ("APIFY_ACTOR_ID", "apify", "actor_id", str),
+    ("APIFY_TIMEOUT", "apify", "timeout", int),
+    ("APIFY_MEMORY_MB", "apify", "memory_mb", int),
+    
+    # Security configuration
+    ("APOLLO_ENABLE_ENCRYPTION", "security", "enable_encryption", _parse_bool),
+    ("APOLLO_SESSION_TIMEOUT", "security", "session_timeout_minutes", int),
+    
+    # Logging configuration
+    ("APOLLO_LOG_LEVEL", "logging", "log_level", str),
+    ("APOLLO_LOG_DIRECTORY", "logging", "log_directory", str),
+)
+
+
+@dataclass(slots=True)
 class BrowserConfiguration:
     """Browser-specific configuration with security defaults"""
     headless: bool = False
@@ -64,11 +163,11 @@ class BrowserConfiguration:
     page_load_timeout: int = 30000
     
     # Security settings
-    allowed_domains: List[str] = field(default_factory=lambda: [
+    allowed_domains: Tuple[str, ...] = (
         "*.apollo.io", 
         "accounts.google.com", 
         "*.googleusercontent.com"
-    ])
+    )
     
     # Performance settings
     disable_images: bool = False
@@ -78,8 +177,42 @@ class BrowserConfiguration:
     # Anti-detection settings
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
     
+    # Lazily built browser args, dropped whenever a dependent field changes
+    _args_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _domain_matchers_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # "--user-agent=..." flag, kept in sync whenever user_agent is assigned
+    _user_agent_flag: str = field(init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        if name in _BROWSER_ARGS_FIELDS:
+            object.__setattr__(self, "_args_cache", None)
+            if name == "user_agent":
+                object.__setattr__(self, "_user_agent_flag", "--user-agent=" + value)
+        elif name == "allowed_domains":
+            value = tuple(value)
+            object.__setattr__(self, "_domain_matchers_cache", None)
+        object.__setattr__(self, name, value)
+    
+    @property
+    def _domain_matchers(self) -> Tuple["re.Pattern[str]", ...]:
+        """Compiled wildcard patterns for allowed_domains, built once"""
+        if self._domain_matchers_cache is None:
+            self._domain_matchers_cache = tuple(
+                re.compile(fnmatch.translate(pattern.lower()))
+                for pattern in self.allowed_domains
+            )
+        return self._domain_matchers_cache
+    
+    def is_allowed_domain(self, hostname: str) -> bool:
+        """Check a hostname against the allowed domain patterns"""
+        hostname = hostname.lower()
+        return any(matcher.match(hostname) for matcher in self._domain_matchers)
+    
     def get_browser_args(self) -> List[str]:
         """Get comprehensive browser arguments for anti-detection"""
+        if self._args_cache is not None:
+            return list(self._args_cache)
+        
         args = [
             "--disable-blink-features=AutomationControlled",
             "--disable-dev-shm-usage", 
@@ -103,7 +236,7 @@ class BrowserConfiguration:
             "--disable-sync",
             "--metrics-recording-only",
             "--no-report-upload",
-            f"--user-agent={self.user_agent}"
+            self._user_agent_flag
         ]
         
         # Performance optimizations
@@ -113,17 +246,18 @@ class BrowserConfiguration:
             args.append("--disable-css-inspector")
         if self.disable_fonts:
             args.append("--disable-font-loading")
-            
+        
+        self._args_cache = tuple(args)
         return args
 
 
-@dataclass
+@dataclass(slots=True)
 class ApolloConfiguration:
     """Apollo.io specific configuration"""
     max_contacts: int = 200
-    job_titles: List[str] = field(default_factory=lambda: [
+    job_titles: Tuple[str, ...] = (
         "CEO", "CTO", "CFO", "VP Sales", "VP Marketing"
-    ])
+    )
     
     # Rate limiting
     request_delay: float = 2.0
@@ -140,7 +274,7 @@ class ApolloConfiguration:
     search_id_timeout: int = 30
 
 
-@dataclass
+@dataclass(slots=True)
 class ApifyConfiguration:
     """Apify scraper configuration"""
     actor_id: str = "jljBwyyQakqrL1wae"
@@ -156,7 +290,7 @@ class ApifyConfiguration:
     max_pages: int = 10
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityConfiguration:
     """Security and privacy configuration"""
     enable_encryption: bool = True
@@ -173,7 +307,7 @@ class SecurityConfiguration:
     monitor_memory: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class LoggingConfiguration:
     """Logging and monitoring configuration"""
     log_level: str = "INFO"
@@ -191,6 +325,37 @@ class LoggingConfiguration:
     enable_step_monitoring: bool = True
 
 
+_REQUIRED_ENV_VARS = ("OPENAI_API_KEY", "APIFY_TOKEN")
+
+# (predicate, message) pairs checked against an ApolloConfigManager
+_CHECKS = (
+    # Browser configuration
+    (lambda c: 800 <= c.browser.viewport_width <= 3840,
+     "Browser viewport width must be between 800 and 3840"),
+    (lambda c: 600 <= c.browser.viewport_height <= 2160,
+     "Browser viewport height must be between 600 and 2160"),
+    (lambda c: 1.0 <= c.browser.wait_for_network_idle <= 60.0,
+     "Network idle timeout must be between 1.0 and 60.0 seconds"),
+    
+    # Apollo configuration
+    (lambda c: 1 <= c.apollo.max_contacts <= 1000,
+     "Max contacts must be between 1 and 1000"),
+    (lambda c: 0 <= c.apollo.max_retries <= 10,
+     "Max retries must be between 0 and 10"),
+    (lambda c: bool(c.apollo.job_titles),
+     "At least one job title must be specified"),
+    
+    # Apify configuration
+    (lambda c: 60 <= c.apify.timeout <= 3600,
+     "Apify timeout must be between 60 and 3600 seconds"),
+    (lambda c: 512 <= c.apify.memory_mb <= 8192,
+     "Apify memory must be between 512 and 8192 MB"),
+)
+
+# Hash of the last configuration that passed validation in this process
+_last_validated_key: Optional[int] = None
+
+
 class ApolloConfigManager:
     """Centralized configuration management with validation"""
     
@@ -204,6 +369,7 @@ class ApolloConfigManager:
         self.apify = ApifyConfiguration()
         self.security = SecurityConfiguration()
         self.logging = LoggingConfiguration()
+        self._sensitive_cache: Optional[Dict[str, Dict[str, str]]] = None
         
         # Load from file if exists
         if self.config_file.exists():
@@ -215,37 +381,29 @@ class ApolloConfigManager:
         # Validate configuration
         self.validate_configuration()
     
+    def _sections(self):
+        """Return (name, instance) pairs for every configuration section"""
+        return (
+            ("browser", self.browser),
+            ("apollo", self.apollo),
+            ("apify", self.apify),
+            ("security", self.security),
+            ("logging", self.logging),
+        )
+    
     def load_from_file(self):
         """Load configuration from JSON file"""
         try:
-            with open(self.config_file, 'r') as f:
-                config_data = json.load(f)
+            config_data = json_loads(self.config_file.read_bytes())
             
             # Update configurations from file
-            if "browser" in config_data:
-                for key, value in config_data["browser"].items():
-                    if hasattr(self.browser, key):
-                        setattr(self.browser, key, value)
-            
-            if "apollo" in config_data:
-                for key, value in config_data["apollo"].items():
-                    if hasattr(self.apollo, key):
-                        setattr(self.apollo, key, value)
-            
-            if "apify" in config_data:
-                for key, value in config_data["apify"].items():
-                    if hasattr(self.apify, key):
-                        setattr(self.apify, key, value)
-            
-            if "security" in config_data:
-                for key, value in config_data["security"].items():
-                    if hasattr(self.security, key):
-                        setattr(self.security, key, value)
-            
-            if "logging" in config_data:
-                for key, value in config_data["logging"].items():
-                    if hasattr(self.logging, key):
-                        setattr(self.logging, key, value)
+            for name, section in self._sections():
+                for key, value in config_data.get(name, {}).items():
+                    if not key.startswith("_") and hasattr(section, key):
+                        # Sections are read-only after load, so keep sequences immutable
+                        if isinstance(value, list):
+                            value = tuple(value)
+                        setattr(section, key, value)
             
             logger.info("Configuration loaded from file", file=str(self.config_file))
             
@@ -256,55 +414,25 @@ class ApolloConfigManager:
     
     def load_from_environment(self):
         """Load configuration from environment variables"""
-        env_mappings = {
-            # Browser configuration
-            "APOLLO_HEADLESS": ("browser", "headless", bool),
-            "APOLLO_STEALTH": ("browser", "stealth", bool),
-            "APOLLO_VIEWPORT_WIDTH": ("browser", "viewport_width", int),
-            "APOLLO_VIEWPORT_HEIGHT": ("browser", "viewport_height", int),
-            
-            # Apollo configuration
-            "APOLLO_MAX_CONTACTS": ("apollo", "max_contacts", int),
-            "APOLLO_REQUEST_DELAY": ("apollo", "request_delay", float),
-            "APOLLO_MAX_RETRIES": ("apollo", "max_retries", int),
-            
-            # Apify configuration
-            "APIFY_ACTOR_ID": ("apify", "actor_id", str),
-            "APIFY_TIMEOUT": ("apify", "timeout", int),
-            "APIFY_MEMORY_MB": ("apify", "memory_mb", int),
-            
-            # Security configuration
-            "APOLLO_ENABLE_ENCRYPTION": ("security", "enable_encryption", bool),
-            "APOLLO_SESSION_TIMEOUT": ("security", "session_timeout_minutes", int),
-            
-            # Logging configuration
-            "APOLLO_LOG_LEVEL": ("logging", "log_level", str),
-            "APOLLO_LOG_DIRECTORY": ("logging", "log_directory", str),
-        }
+        debug_enabled = _debug_enabled()
+        env_get = os.environ.get
         
-        for env_var, (section, key, value_type) in env_mappings.items():
-            env_value = os.getenv(env_var)
+        for env_var, section, key, converter in _ENV_MAPPINGS:
+            env_value = env_get(env_var)
             if env_value is not None:
                 try:
-                    # Convert to appropriate type
-                    if value_type == bool:
-                        converted_value = env_value.lower() in ('true', '1', 'yes', 'on')
-                    elif value_type == int:
-                        converted_value = int(env_value)
-                    elif value_type == float:
-                        converted_value = float(env_value)
-                    else:
-                        converted_value = env_value
+                    converted_value = converter(env_value)
                     
                     # Set the value
                     config_section = getattr(self, section)
                     setattr(config_section, key, converted_value)
                     
-                    logger.debug("Environment variable loaded", 
-                               var=env_var, 
-                               section=section, 
-                               key=key, 
-                               value=converted_value)
+                    if debug_enabled:
+                        logger.debug("Environment variable loaded", 
+                                   var=env_var, 
+                                   section=section, 
+                                   key=key, 
+                                   value=converted_value)
                     
                 except (ValueError, TypeError) as e:
                     logger.warning("Failed to parse environment variable", 
@@ -312,46 +440,38 @@ class ApolloConfigManager:
                                  value=env_value, 
                                  error=str(e))
     
+    def _validation_key(self) -> Optional[int]:
+        """Hash of every validated input, or None if a value is unhashable"""
+        try:
+            return hash((
+                tuple(
+                    tuple(getattr(section, f.name) for f in fields(section) if not f.name.startswith("_"))
+                    for _, section in self._sections()
+                ),
+                tuple(bool(os.getenv(var)) for var in _REQUIRED_ENV_VARS),
+            ))
+        except TypeError:
+            return None
+    
     def validate_configuration(self):
         """Validate configuration values"""
+        global _last_validated_key
+        
+        # Skip re-validation (e.g. on reload_config) when nothing has changed
+        validation_key = self._validation_key()
+        if validation_key is not None and validation_key == _last_validated_key:
+            logger.debug("Configuration unchanged since last validation")
+            return
+        
         errors = []
         
         # Validate required environment variables
-        required_env_vars = [
-            "OPENAI_API_KEY",
-            "APIFY_TOKEN"
-        ]
-        
-        for var in required_env_vars:
+        for var in _REQUIRED_ENV_VARS:
             if not os.getenv(var):
                 errors.append(f"Missing required environment variable: {var}")
         
-        # Validate browser configuration
-        if self.browser.viewport_width < 800 or self.browser.viewport_width > 3840:
-            errors.append("Browser viewport width must be between 800 and 3840")
-        
-        if self.browser.viewport_height < 600 or self.browser.viewport_height > 2160:
-            errors.append("Browser viewport height must be between 600 and 2160")
-        
-        if self.browser.wait_for_network_idle < 1.0 or self.browser.wait_for_network_idle > 60.0:
-            errors.append("Network idle timeout must be between 1.0 and 60.0 seconds")
-        
-        # Validate Apollo configuration
-        if self.apollo.max_contacts < 1 or self.apollo.max_contacts > 1000:
-            errors.append("Max contacts must be between 1 and 1000")
-        
-        if self.apollo.max_retries < 0 or self.apollo.max_retries > 10:
-            errors.append("Max retries must be between 0 and 10")
-        
-        if not self.apollo.job_titles:
-            errors.append("At least one job title must be specified")
-        
-        # Validate Apify configuration
-        if self.apify.timeout < 60 or self.apify.timeout > 3600:
-            errors.append("Apify timeout must be between 60 and 3600 seconds")
-        
-        if self.apify.memory_mb < 512 or self.apify.memory_mb > 8192:
-            errors.append("Apify memory must be between 512 and 8192 MB")
+        # Validate section values
+        errors.extend(message for is_valid, message in _CHECKS if not is_valid(self))
         
         # Validate paths
         if self.logging.enable_file_logging:
@@ -362,64 +482,27 @@ class ApolloConfigManager:
                 errors.append(f"Cannot create log directory {log_dir}: {e}")
         
         if errors:
-            error_message = "Configuration validation failed:\n" + "\n".join(f"- {error}" for error in errors)
+            error_message = "Configuration validation failed:\n- " + "\n- ".join(errors)
             raise ConfigurationError(
                 "configuration", 
                 error_message,
                 context={"errors": errors}
             )
         
+        _last_validated_key = validation_key
         logger.info("Configuration validation passed")
     
     def save_to_file(self):
         """Save current configuration to file"""
         config_data = {
-            "browser": {
-                "headless": self.browser.headless,
-                "stealth": self.browser.stealth,
-                "viewport_width": self.browser.viewport_width,
-                "viewport_height": self.browser.viewport_height,
-                "wait_for_network_idle": self.browser.wait_for_network_idle,
-                "allowed_domains": self.browser.allowed_domains,
-                "disable_images": self.browser.disable_images,
-                "disable_css": self.browser.disable_css,
-                "disable_fonts": self.browser.disable_fonts
-            },
-            "apollo": {
-                "max_contacts": self.apollo.max_contacts,
-                "job_titles": self.apollo.job_titles,
-                "request_delay": self.apollo.request_delay,
-                "max_requests_per_minute": self.apollo.max_requests_per_minute,
-                "max_retries": self.apollo.max_retries,
-                "retry_delay": self.apollo.retry_delay,
-                "exponential_backoff": self.apollo.exponential_backoff
-            },
-            "apify": {
-                "actor_id": self.apify.actor_id,
-                "timeout": self.apify.timeout,
-                "memory_mb": self.apify.memory_mb,
-                "max_records": self.apify.max_records,
-                "max_pages": self.apify.max_pages
-            },
-            "security": {
-                "enable_encryption": self.security.enable_encryption,
-                "store_credentials": self.security.store_credentials,
-                "log_sensitive_data": self.security.log_sensitive_data,
-                "session_timeout_minutes": self.security.session_timeout_minutes,
-                "auto_cleanup_sessions": self.security.auto_cleanup_sessions
-            },
-            "logging": {
-                "log_level": self.logging.log_level,
-                "log_format": self.logging.log_format,
-                "enable_file_logging": self.logging.enable_file_logging,
-                "log_directory": self.logging.log_directory,
-                "enable_performance_logging": self.logging.enable_performance_logging,
-                "enable_error_screenshots": self.logging.enable_error_screenshots
-            }
+            name: asdict(section, dict_factory=_persisted_fields)
+            for name, section in self._sections()
         }
         
-        with open(self.config_file, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        # Write to a temp file and swap it in so a crash never leaves a torn config
+        tmp_file = self.config_file.with_suffix(self.config_file.suffix + ".tmp")
+        tmp_file.write_bytes(json_dumps(config_data, indent=True))
+        os.replace(tmp_file, self.config_file)
         
         logger.info("Configuration saved to file", file=str(self.config_file))
     
@@ -433,7 +516,7 @@ class ApolloConfigManager:
                 "height": self.browser.viewport_height
             },
             "wait_for_network_idle_page_load_time": self.browser.wait_for_network_idle,
-            "allowed_domains": self.browser.allowed_domains,
+            "allowed_domains": list(self.browser.allowed_domains),
             "args": self.browser.get_browser_args(),
             "java_script_enabled": True,
             "ignore_https_errors": False,
@@ -445,17 +528,23 @@ class ApolloConfigManager:
         if not self.security.store_credentials:
             return {}
         
-        return {
+        # Resolved once per manager; reload_config() builds a fresh instance
+        if self._sensitive_cache is not None:
+            return self._sensitive_cache
+        
+        env_get = os.environ.get
+        self._sensitive_cache = {
             "https://app.apollo.io": {
-                "x_apollo_email": os.getenv("APOLLO_EMAIL", ""),
-                "x_apollo_password": os.getenv("APOLLO_PASSWORD", ""),
-                "x_apollo_api_key": os.getenv("APOLLO_API_KEY", "")
+                "x_apollo_email": env_get("APOLLO_EMAIL", ""),
+                "x_apollo_password": env_get("APOLLO_PASSWORD", ""),
+                "x_apollo_api_key": env_get("APOLLO_API_KEY", "")
             },
             "https://accounts.google.com": {
-                "x_google_email": os.getenv("GOOGLE_EMAIL", ""),
-                "x_google_password": os.getenv("GOOGLE_PASSWORD", "")
+                "x_google_email": env_get("GOOGLE_EMAIL", ""),
+                "x_google_password": env_get("GOOGLE_PASSWORD", "")
             }
         }
+        return self._sensitive_cache
     
     def get_summary(self) -> Dict[str, Any]:
         """Get configuration summary for logging"""
@@ -494,6 +583,8 @@ def get_config() -> ApolloConfigManager:
 def reload_config():
     """Reload configuration from files and environment"""
     global config_manager
+    if _DOTENV_STALE:
+        _load_dotenv_cache()
     config_manager = ApolloConfigManager()
     logger.info("Configuration reloaded")
 
@@ -4,9 +4,31 @@ Following browser-use best practices for structured error handling
 """
 
 from typing import Optional, Dict, Any
+import random
+import re
+import sys
+import time
 import traceback
+from collections import Counter
 from datetime import datetime
 
+from serialization import json_dumps
+
+
+# Multiplicative jitter applied to retry delays so concurrent workers spread out
+_RETRY_JITTER = 0.5
+
+# Markers that cause an error context to be redacted before logging
+_SENSITIVE_RE = re.compile(r"password|api[_-]?key|secret|token|authorization|cookie", re.IGNORECASE)
+
+
+def _merge_ctx(kwargs: Dict[str, Any], **extra) -> Dict[str, Any]:
+    """Merge non-None subclass fields into the context passed via kwargs"""
+    context = kwargs.pop('context', None) or {}
+    context.update({key: value for key, value in extra.items() if value is not None})
+    kwargs['context'] = context
+    return kwargs
+
 
 class ApolloAutomationError(Exception):
     """Base exception for Apollo.io automation errors"""
@@ -24,11 +46,40 @@ class ApolloAutomationError(Exception):
         self.context = context or {}
         self.recoverable = recoverable
         self.retry_after = retry_after
-        self.timestamp = datetime.now()
-        self.traceback = traceback.format_exc()
+        self._ts_ns = time.time_ns()
+        
+        # Snapshot the active exception as frame-free summaries (no live frames or
+        # locals are kept); the text is formatted on first access
+        exc_info = sys.exc_info()
+        self._tb_exc = (
+            traceback.TracebackException(*exc_info, lookup_lines=False)
+            if exc_info[0] is not None else None
+        )
+        self._traceback_str = None
         
         super().__init__(self.message)
     
+    @property
+    def timestamp(self) -> datetime:
+        """Local time the error was created"""
+        return datetime.fromtimestamp(self._ts_ns / 1e9)
+    
+    @property
+    def traceback(self) -> str:
+        """Formatted traceback of the exception active at construction time"""
+        if self._traceback_str is None:
+            if self._tb_exc is None:
+                self._traceback_str = "NoneType: None\n"
+            else:
+                self._traceback_str = "".join(self._tb_exc.format())
+                self._tb_exc = None
+        return self._traceback_str
+    
+    def release_frames(self) -> None:
+        """Keep the formatted traceback but drop references to live frames"""
+        self.traceback  # materialize before releasing
+        self.__traceback__ = None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dictionary for structured logging"""
         return {
@@ -42,14 +93,16 @@ class ApolloAutomationError(Exception):
             "traceback": self.traceback
         }
     
+    def to_json_bytes(self) -> bytes:
+        """Serialize to_dict() as UTF-8 JSON for structured log sinks"""
+        return json_dumps(self.to_dict(), default=str)
+    
     def sanitize_for_logging(self) -> Dict[str, Any]:
         """Sanitized version safe for logging (removes sensitive data)"""
         safe_dict = self.to_dict()
         
         # Remove potentially sensitive information
-        if 'password' in str(safe_dict['context']).lower():
-            safe_dict['context'] = "[REDACTED - Contains sensitive data]"
-        if 'api_key' in str(safe_dict['context']).lower():
+        if _SENSITIVE_RE.search(str(safe_dict['context'])):
             safe_dict['context'] = "[REDACTED - Contains sensitive data]"
         
         return safe_dict
@@ -59,9 +112,7 @@ class AuthenticationError(ApolloAutomationError):
     """Authentication-related errors"""
     
     def __init__(self, message: str, auth_method: str = None, **kwargs):
-        context = kwargs.get('context', {})
-        context['auth_method'] = auth_method
-        kwargs['context'] = context
+        _merge_ctx(kwargs, auth_method=auth_method)
         kwargs['recoverable'] = True  # Auth errors are usually recoverable
         super().__init__(message, **kwargs)
 
@@ -88,9 +139,7 @@ class BrowserError(ApolloAutomationError):
     """Browser-related errors"""
     
     def __init__(self, message: str, browser_type: str = None, **kwargs):
-        context = kwargs.get('context', {})
-        context['browser_type'] = browser_type
-        kwargs['context'] = context
+        _merge_ctx(kwargs, browser_type=browser_type)
         super().__init__(message, **kwargs)
 
 
@@ -108,9 +157,7 @@ class PageLoadError(BrowserError):
     
     def __init__(self, url: str, timeout: float = None, **kwargs):
         message = f"Page failed to load: {url}"
-        context = kwargs.get('context', {})
-        context.update({'url': url, 'timeout': timeout})
-        kwargs['context'] = context
+        _merge_ctx(kwargs, url=url, timeout=timeout)
         kwargs['recoverable'] = True
         kwargs['retry_after'] = 30
         super().__init__(message, **kwargs)
@@ -121,9 +168,7 @@ class ElementNotFoundError(BrowserError):
     
     def __init__(self, selector: str, page_url: str = None, **kwargs):
         message = f"Element not found: {selector}"
-        context = kwargs.get('context', {})
-        context.update({'selector': selector, 'page_url': page_url})
-        kwargs['context'] = context
+        _merge_ctx(kwargs, selector=selector, page_url=page_url)
         kwargs['recoverable'] = True
         super().__init__(message, **kwargs)
 
@@ -158,9 +203,7 @@ class ApolloUIChangeError(ApolloServiceError):
     
     def __init__(self, outdated_selector: str, **kwargs):
         message = f"Apollo.io UI changed. Selector may be outdated: {outdated_selector}"
-        context = kwargs.get('context', {})
-        context['outdated_selector'] = outdated_selector
-        kwargs['context'] = context
+        _merge_ctx(kwargs, outdated_selector=outdated_selector)
         kwargs['recoverable'] = False  # Needs code update
         super().__init__(message, **kwargs)
 
@@ -175,9 +218,7 @@ class SearchIDExtractionError(DataExtractionError):
     
     def __init__(self, current_url: str, **kwargs):
         message = f"Failed to extract search ID from URL: {current_url}"
-        context = kwargs.get('context', {})
-        context['current_url'] = current_url
-        kwargs['context'] = context
+        _merge_ctx(kwargs, current_url=current_url)
         kwargs['recoverable'] = True
         super().__init__(message, **kwargs)
 
@@ -187,10 +228,8 @@ class DomainFilterError(DataExtractionError):
     
     def __init__(self, domains: list, **kwargs):
         message = f"Failed to apply domain filters for {len(domains)} domains"
-        context = kwargs.get('context', {})
-        context['domains_count'] = len(domains)
-        context['domains'] = domains[:5]  # Only log first 5 for brevity
-        kwargs['context'] = context
+        # Only log first 5 domains for brevity
+        _merge_ctx(kwargs, domains_count=len(domains), domains=domains[:5])
         kwargs['recoverable'] = True
         super().__init__(message, **kwargs)
 
@@ -214,9 +253,7 @@ class ApifyScrapingError(ApifyError):
     
     def __init__(self, dataset_id: str = None, run_id: str = None, **kwargs):
         message = "Apify scraping operation failed"
-        context = kwargs.get('context', {})
-        context.update({'dataset_id': dataset_id, 'run_id': run_id})
-        kwargs['context'] = context
+        _merge_ctx(kwargs, dataset_id=dataset_id, run_id=run_id)
         kwargs['recoverable'] = True
         kwargs['retry_after'] = 120
         super().__init__(message, **kwargs)
@@ -227,9 +264,7 @@ class ConfigurationError(ApolloAutomationError):
     
     def __init__(self, config_type: str, issue: str, **kwargs):
         message = f"Configuration error in {config_type}: {issue}"
-        context = kwargs.get('context', {})
-        context['config_type'] = config_type
-        kwargs['context'] = context
+        _merge_ctx(kwargs, config_type=config_type)
         kwargs['recoverable'] = False
         super().__init__(message, **kwargs)
 
@@ -239,9 +274,7 @@ class EnvironmentError(ConfigurationError):
     
     def __init__(self, missing_var: str, **kwargs):
         message = f"Missing required environment variable: {missing_var}"
-        context = kwargs.get('context', {})
-        context['missing_variable'] = missing_var
-        kwargs['context'] = context
+        _merge_ctx(kwargs, missing_variable=missing_var)
         super().__init__("environment", message, **kwargs)
 
 
@@ -250,38 +283,67 @@ class ErrorHandler:
     """Centralized error handling with retry logic"""
     
     def __init__(self):
-        self.error_counts = {}
+        # Retry counts keyed by (error class, error code), one budget per handler
+        self.error_counts = Counter()
         self.max_retries = 3
     
+    def snapshot(self) -> Dict[tuple, int]:
+        """Copy of this handler's retry counts, most frequent first, for metrics"""
+        return dict(self.error_counts.most_common())
+    
     def should_retry(self, error: ApolloAutomationError) -> bool:
         """Determine if error should trigger a retry"""
         if not error.recoverable:
             return False
         
-        error_key = f"{error.__class__.__name__}:{error.error_code}"
-        current_count = self.error_counts.get(error_key, 0)
-        
-        if current_count >= self.max_retries:
+        error_key = (type(error), error.error_code)
+        if self.error_counts[error_key] >= self.max_retries:
             return False
         
-        self.error_counts[error_key] = current_count + 1
+        self.error_counts[error_key] += 1
+        # The operation is about to be retried; don't pin this attempt's frames
+        error.release_frames()
         return True
     
-    def get_retry_delay(self, error: ApolloAutomationError) -> int:
-        """Get appropriate delay before retry"""
+    def get_retry_delay(self, error: ApolloAutomationError) -> float:
+        """Get appropriate delay before retry, jittered to avoid synchronized retries"""
         if error.retry_after:
-            return error.retry_after
+            # Never retry sooner than the service asked; jitter only adds to it
+            base = error.retry_after
+        else:
+            # Default exponential backoff
+            attempt = self.error_counts.get((type(error), error.error_code), 1)
+            base = min(30, 2 ** attempt)  # Max 30 seconds before jitter
         
-        # Default exponential backoff
-        error_key = f"{error.__class__.__name__}:{error.error_code}"
-        attempt = self.error_counts.get(error_key, 1)
-        return min(60, 2 ** attempt)  # Max 60 seconds
+        return base * (1 + random.uniform(0, _RETRY_JITTER))
     
     def reset_error_count(self, error_class: type):
         """Reset error count for successful operations"""
-        for key in list(self.error_counts.keys()):
-            if key.startswith(error_class.__name__):
-                del self.error_counts[key]
+        for key in [key for key in self.error_counts if key[0] is error_class]:
+            del self.error_counts[key]
+
+
+# Keyword dispatch for handle_browser_use_errors. Each branch is a lookahead
+# anchored at the start, so alternatives are tried in priority order in a
+# single pass regardless of where the keywords appear in the message.
+_ERROR_DISPATCH_RE = re.compile(
+    r"^(?:"
+    r"(?=.*?rate limit)(?P<rate_limit>)"
+    r"|(?=.*?cloudflare)(?P<cloudflare>)"
+    r"|(?=.*?(?:timeout|navigation))(?P<page_load>)"
+    r"|(?=.*?element)(?=.*?not found)(?P<element>)"
+    r"|(?=.*?(?:authentication|login))(?P<auth>)"
+    r")",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_ERROR_FACTORIES = {
+    "rate_limit": lambda message, context: RateLimitError(context=context),
+    "cloudflare": lambda message, context: CloudflareError(context=context),
+    "page_load": lambda message, context: PageLoadError("unknown", context=context),
+    "element": lambda message, context: ElementNotFoundError("unknown", context=context),
+    "auth": lambda message, context: AuthenticationError(message, context=context),
+}
 
 
 def handle_browser_use_errors(func):
@@ -290,24 +352,19 @@ def handle_browser_use_errors(func):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            error_message = str(e).lower()
+            error_message = str(e)
             
             # Map common browser-use errors to our exception hierarchy
-            if "rate limit" in error_message:
-                raise RateLimitError(context={'original_error': str(e)})
-            elif "cloudflare" in error_message:
-                raise CloudflareError(context={'original_error': str(e)})
-            elif "timeout" in error_message or "navigation" in error_message:
-                raise PageLoadError("unknown", context={'original_error': str(e)})
-            elif "element" in error_message and "not found" in error_message:
-                raise ElementNotFoundError("unknown", context={'original_error': str(e)})
-            elif "authentication" in error_message or "login" in error_message:
-                raise AuthenticationError(str(e), context={'original_error': str(e)})
-            else:
-                # Generic automation error for unmapped exceptions
-                raise ApolloAutomationError(
-                    f"Unexpected error: {str(e)}", 
-                    context={'original_error': str(e), 'original_type': type(e).__name__}
+            match = _ERROR_DISPATCH_RE.match(error_message)
+            if match:
+                raise _ERROR_FACTORIES[match.lastgroup](
+                    error_message, {'original_error': error_message}
                 )
+            
+            # Generic automation error for unmapped exceptions
+            raise ApolloAutomationError(
+                f"Unexpected error: {error_message}", 
+                context={'original_error': error_message, 'original_type': type(e).__name__}
+            )
     
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -8,6 +8,13 @@ import asyncio
 from playwright.async_api import async_playwright
 from pathlib import Path
 
+from serialization import json_dumps
+
+
+def _dump_storage_state(storage_state, storage_file):
+    """Write the captured storage state as indented JSON in a single write"""
+    storage_file.write_bytes(json_dumps(storage_state, indent=True))
+
 async def extract_chrome_session():
     """Extract working session from manual Chrome login"""
     
@@ -59,9 +66,7 @@ async def extract_chrome_session():
         storage_file = Path("cookies/verified_storage_state.json")
         storage_file.parent.mkdir(exist_ok=True)
         
-        import json
-        with open(storage_file, 'w') as f:
-            json.dump(storage_state, f, indent=2)
+        _dump_storage_state(storage_state, storage_file)
         
         print(f"✅ Session saved to: {storage_file}")
         
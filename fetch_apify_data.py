@@ -6,22 +6,47 @@ This script fetches and processes data from a completed Apify actor run.
 Use this after you've run the Apollo scraper in Apify dashboard.
 
 Usage:
-    python fetch_apify_data.py
+    python fetch_apify_data.py [--emit-csv]
 
 You'll be prompted to enter your Apify run ID or dataset ID.
+Contacts are saved as Parquet with the run metadata embedded; pass
+--emit-csv to also write a CSV copy.
 """
 
 import os
-import json
+import sys
 import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 from apify_client import ApifyClient
 
+from serialization import json_dumps
+
+# Optional columnar output - graceful fallback to CSV + metadata JSON
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # Load environment variables
 load_dotenv()
 
+# Low-cardinality string columns in Apollo contact exports
+CATEGORICAL_COLUMNS = ("organization_name", "title")
+
+@dataclass(frozen=True)
+class ExtractionStats:
+    """Contact statistics computed once in process_contacts and reused when saving"""
+    total: int
+    email_count: int
+    columns: Tuple[str, ...]
+
 def setup_apify_client():
     """Setup Apify client with token"""
     token = os.getenv("APIFY_TOKEN")
@@ -51,13 +76,13 @@ def fetch_by_run_id(client, run_id):
         
         if not dataset_id:
             print("❌ No dataset found for this run")
-            return None
+            return None, None
         
         print(f"📦 Dataset ID: {dataset_id}")
         
-        # Fetch dataset items
+        # Items are streamed lazily; process_contacts consumes them once
         dataset_client = client.dataset(dataset_id)
-        items = list(dataset_client.iterate_items())
+        items = dataset_client.iterate_items()
         
         return items, dataset_id
         
@@ -71,7 +96,7 @@ def fetch_by_dataset_id(client, dataset_id):
         print(f"📦 Fetching dataset: {dataset_id}")
         
         dataset_client = client.dataset(dataset_id)
-        items = list(dataset_client.iterate_items())
+        items = dataset_client.iterate_items()
         
         return items, dataset_id
         
@@ -81,34 +106,65 @@ def fetch_by_dataset_id(client, dataset_id):
 
 def process_contacts(items):
     """Process and clean contact data"""
-    if not items:
+    if items is None:
         print("❌ No items to process")
-        return None
+        return None, None
+    
+    print("📊 Processing contacts...")
+    
+    # Build the DataFrame straight from the item stream so no separate
+    # list of records outlives it
+    try:
+        df = pd.DataFrame.from_records(items)
+    except Exception as e:
+        print(f"❌ Error fetching dataset items: {e}")
+        return None, None
     
-    print(f"📊 Processing {len(items)} contacts...")
+    if df.empty:
+        print("❌ No items to process")
+        return None, None
+    
+    if HAS_PYARROW:
+        # Arrow-backed string columns are far smaller than numpy object arrays
+        # and convert to the Parquet table without a copy
+        try:
+            df = df.convert_dtypes(dtype_backend="pyarrow")
+        except (TypeError, ValueError, pa.ArrowException):
+            pass  # Keep numpy dtypes if a column resists conversion
     
-    # Convert to DataFrame for easier processing
-    df = pd.DataFrame(items)
+    # Company and title values repeat heavily across contacts; categoricals store
+    # each distinct string once and are written as Parquet dictionary columns
+    repeated = [col for col in CATEGORICAL_COLUMNS if col in df.columns]
+    if repeated:
+        try:
+            df = df.astype({col: "category" for col in repeated})
+        except (TypeError, ValueError):
+            pass  # Unhashable values (e.g. nested dicts) stay as-is
+    
+    has_email = 'email' in df.columns
+    stats = ExtractionStats(
+        total=len(df),
+        # Series.count() tallies non-null cells without building a boolean mask
+        email_count=int(df['email'].count()) if has_email else 0,
+        columns=tuple(df.columns),
+    )
     
     # Display basic stats
-    print(f"✅ Total contacts: {len(df)}")
+    print(f"✅ Total contacts: {stats.total}")
+    print(f"📊 Columns: {', '.join(stats.columns)}")
     
-    if not df.empty:
-        print(f"📊 Columns: {', '.join(df.columns)}")
-        
-        # Check for key fields
-        key_fields = ['first_name', 'last_name', 'email', 'title', 'organization_name']
-        available_fields = [field for field in key_fields if field in df.columns]
-        print(f"🔑 Key fields available: {', '.join(available_fields)}")
-        
-        # Check email availability
-        if 'email' in df.columns:
-            emails_available = df['email'].notna().sum()
-            print(f"📧 Contacts with emails: {emails_available}/{len(df)}")
+    # Check for key fields
+    key_fields = ['first_name', 'last_name', 'email', 'title', 'organization_name']
+    available_fields = [field for field in key_fields if field in stats.columns]
+    print(f"🔑 Key fields available: {', '.join(available_fields)}")
     
-    return df
+    # Check email availability
+    if has_email:
+        print(f"📧 Contacts with emails: {stats.email_count}/{stats.total}")
+    
+    return df, stats
 
-def save_data(df, dataset_id):
+def save_data(df, stats, dataset_id, emit_csv=False):
     """Save processed data to files"""
     if df is None or df.empty:
         print("❌ No data to save")
@@ -122,29 +178,51 @@ def save_data(df, dataset_id):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base_filename = f"apollo_contacts_{timestamp}"
     
-    # Save as CSV
-    csv_file = output_dir / f"{base_filename}.csv"
-    df.to_csv(csv_file, index=False)
-    print(f"💾 CSV saved: {csv_file}")
-    
-    # Save as JSON
-    json_file = output_dir / f"{base_filename}.json"
-    df.to_json(json_file, orient='records', indent=2)
-    print(f"💾 JSON saved: {json_file}")
-    
-    # Save metadata
     metadata = {
         "dataset_id": dataset_id,
         "extraction_date": datetime.now().isoformat(),
-        "total_contacts": len(df),
-        "columns": list(df.columns),
-        "contacts_with_email": df['email'].notna().sum() if 'email' in df.columns else 0
+        "total_contacts": stats.total,
+        "columns": list(stats.columns),
+        "contacts_with_email": stats.email_count
     }
     
-    metadata_file = output_dir / f"{base_filename}_metadata.json"
-    with open(metadata_file, 'w') as f:
-        json.dump(metadata, f, indent=2)
-    print(f"📋 Metadata saved: {metadata_file}")
+    table = None
+    wrote_parquet = False
+    if HAS_PYARROW:
+        # Single columnar write with the metadata stored in the file itself
+        parquet_file = output_dir / f"{base_filename}.parquet"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b"apollo_metadata": json_dumps(metadata),
+            })
+            pq.write_table(table, parquet_file, compression="zstd")
+            wrote_parquet = True
+            print(f"💾 Parquet saved: {parquet_file}")
+        except (OSError, pa.ArrowException) as e:
+            # Mixed or nested object columns - keep the CSV + metadata JSON output
+            print(f"⚠️ Could not write Parquet ({e}) - saving CSV instead")
+    else:
+        print("⚠️ pyarrow not installed - saving CSV instead of Parquet")
+    
+    if emit_csv or not wrote_parquet:
+        csv_file = output_dir / f"{base_filename}.csv"
+        if table is not None:
+            try:
+                # Vectorized writer over the Arrow table already built above
+                pcsv.write_csv(table, str(csv_file))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Nested columns (e.g. employment_history) have no CSV form in Arrow
+                df.to_csv(csv_file, index=False)
+        else:
+            df.to_csv(csv_file, index=False)
+        print(f"💾 CSV saved: {csv_file}")
+    
+    if not wrote_parquet:
+        metadata_file = output_dir / f"{base_filename}_metadata.json"
+        metadata_file.write_bytes(json_dumps(metadata, indent=True))
+        print(f"📋 Metadata saved: {metadata_file}")
 
 def main():
     """Main function"""
@@ -187,10 +265,10 @@ def main():
         return
     
     # Process the data
-    df = process_contacts(items)
+    df, stats = process_contacts(items)
     
     # Save results
-    save_data(df, dataset_id)
+    save_data(df, stats, dataset_id, emit_csv="--emit-csv" in sys.argv[1:])
     
     print(f"\n🎉 Data processing complete!")
     print("📁 Check the 'output' folder for your files")
@@ -20,11 +20,37 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from browser_use import Agent
+from browser_use.browser.profile import BrowserProfile
 from browser_use.llm.openai.chat import ChatOpenAI
 
 # Load environment variables
 load_dotenv()
 
+_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+_UA_ARG = f"--user-agent={_UA}"
+
+# Enhanced browser args to avoid detection during manual login
+_STEALTH_ARGS = (
+    "--disable-blink-features=AutomationControlled",  # Hide automation
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-web-security",
+    # Idle Chromium services the login flow never uses
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    _UA_ARG,
+)
+
+# Validation reuses the capture user agent so the session sees the same browser
+_VALIDATION_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    _UA_ARG,
+)
+
 
 async def capture_apollo_session():
     """Capture authenticated Apollo session through manual login"""
@@ -46,20 +72,12 @@ async def capture_apollo_session():
     print("-" * 50)
 
     # Enhanced browser profile to avoid detection
-    from browser_use.browser.profile import BrowserProfile
-
     profile = BrowserProfile(
         user_data_dir=str(profile_dir),  # Persistent profile
         wait_for_network_idle_page_load_time=60.0,  # Longer wait for Cloudflare and login
         headless=False,  # Visible browser for manual login
         allowed_domains=["*.apollo.io"],
-        args=[
-            "--disable-blink-features=AutomationControlled",  # Hide automation
-            "--disable-dev-shm-usage",
-            "--no-sandbox",
-            "--disable-web-security",
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        ],
+        args=list(_STEALTH_ARGS),
     )
 
     # Initialize LLM (required for Agent)
@@ -115,16 +133,11 @@ async def validate_existing_session():
     print("🔍 Validating existing session...")
 
     try:
-        from browser_use.browser.profile import BrowserProfile
-
         profile = BrowserProfile(
             storage_state=str(storage_path),
             headless=True,
             allowed_domains=["*.apollo.io"],
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            ],
+            args=list(_VALIDATION_ARGS),
         )
 
         # Use Agent for validation
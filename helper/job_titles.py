@@ -4,7 +4,7 @@ Defines job titles to filter contacts by role
 """
 
 from urllib.parse import quote
-from typing import List, Dict
+from typing import FrozenSet, List, Dict, Tuple
 
 # Primary job titles for contact extraction
 JOB_TITLES = [
@@ -15,9 +15,10 @@ JOB_TITLES = [
     "VP Marketing",
 ]
 
-# Categorized job titles for targeted searches
-JOB_TITLE_CATEGORIES = {
-    "c_suite": [
+# Categorized job titles for targeted searches (tuples keep the order stable
+# in generated URLs; use ALL_JOB_TITLES for membership checks)
+JOB_TITLE_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "c_suite": (
         "CEO",
         "CTO",
         "CFO",
@@ -30,8 +31,8 @@ JOB_TITLE_CATEGORIES = {
         "Chief Marketing Officer",
         "Chief Product Officer",
         "Chief Data Officer",
-    ],
-    "vp_level": [
+    ),
+    "vp_level": (
         "VP Sales",
         "VP Marketing",
         "VP Engineering",
@@ -44,8 +45,8 @@ JOB_TITLE_CATEGORIES = {
         "Vice President Product",
         "Executive Vice President",
         "Senior Vice President",
-    ],
-    "director_level": [
+    ),
+    "director_level": (
         "Director of Sales",
         "Director of Marketing",
         "Director of Engineering",
@@ -57,8 +58,8 @@ JOB_TITLE_CATEGORIES = {
         "Engineering Director",
         "Product Director",
         "Managing Director",
-    ],
-    "head_level": [
+    ),
+    "head_level": (
         "Head of Sales",
         "Head of Marketing",
         "Head of Engineering",
@@ -67,24 +68,36 @@ JOB_TITLE_CATEGORIES = {
         "Head of Business Development",
         "Head of Growth",
         "Head of Customer Success",
-    ],
-    "founders": ["Founder", "Co-Founder", "Founding Partner", "Founding Member"],
+    ),
+    "founders": ("Founder", "Co-Founder", "Founding Partner", "Founding Member"),
+}
+
+# Every categorised title, deduplicated once at import
+ALL_JOB_TITLES: FrozenSet[str] = frozenset().union(*JOB_TITLE_CATEGORIES.values())
+
+# Titles are static, so encode them once at import
+_ENCODED_CACHE: Dict[str, str] = {
+    title: quote(title)
+    for titles in (JOB_TITLES, *JOB_TITLE_CATEGORIES.values())
+    for title in titles
+}
+
+ENCODED_JOB_TITLES_BY_CATEGORY: Dict[str, tuple] = {
+    category: tuple(_ENCODED_CACHE[title] for title in titles)
+    for category, titles in JOB_TITLE_CATEGORIES.items()
 }
 
 
 def get_job_titles_by_category(category: str) -> List[str]:
-    return JOB_TITLE_CATEGORIES.get(category, [])
+    return list(JOB_TITLE_CATEGORIES.get(category, ()))
 
 
-def get_all_job_titles() -> List[str]:
-    all_titles = []
-    for titles in JOB_TITLE_CATEGORIES.values():
-        all_titles.extend(titles)
-    return list(set(all_titles))
+def get_all_job_titles() -> FrozenSet[str]:
+    return ALL_JOB_TITLES
 
 
 def url_encode_job_titles(titles: List[str]) -> List[str]:
-    return [quote(title) for title in titles]
+    return [_ENCODED_CACHE.get(title) or quote(title) for title in titles]
 
 
 def get_priority_titles() -> List[str]:
@@ -98,6 +111,8 @@ def validate_job_title(title: str) -> bool:
 __all__ = [
     "JOB_TITLES",
     "JOB_TITLE_CATEGORIES",
+    "ALL_JOB_TITLES",
+    "ENCODED_JOB_TITLES_BY_CATEGORY",
     "get_job_titles_by_category",
     "get_all_job_titles",
     "url_encode_job_titles",
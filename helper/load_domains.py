@@ -3,43 +3,109 @@ CSV Domain Loader for Browser Automation
 Loads domains from CSV file and formats them for Apollo.io input
 """
 
-import pandas as pd
-from typing import List, Optional
+import csv
+import gc
+import os
+import re
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Optional multithreaded columnar CSV reader - graceful fallback to csv module
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
-def load_domains(path: str) -> str:
+# Files above this size are parsed with the cyclic GC paused; the rows are
+# short-lived strings, so collection passes during the load are pure overhead
+_GC_PAUSE_THRESHOLD = 10 * 1024 * 1024
+
+# Basic domain regex pattern
+_DOMAIN_RE = re.compile(r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+
+
+def iter_domains(path: str) -> Iterator[str]:
     """
-    Load domains from CSV file and return as newline-separated string
+    Stream cleaned domains from a CSV file one row at a time
 
     Args:
         path: Path to CSV file with 'domain' column
 
-    Returns:
-        Newline-separated string of domains
+    Yields:
+        Stripped, non-empty domain strings
 
     Raises:
         FileNotFoundError: If CSV file doesn't exist
         KeyError: If 'domain' column is missing
-        ValueError: If CSV is empty or invalid
+        ValueError: If CSV is empty
     """
-    try:
-        df = pd.read_csv(path)
-
-        if "domain" not in df.columns:
+    # utf-8-sig strips the BOM Excel writes, which would otherwise prefix the header
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV file is empty")
+        if "domain" not in header:
             raise KeyError("CSV file must contain a 'domain' column")
+        idx = header.index("domain")
+
+        for row in reader:
+            if idx < len(row):
+                domain = row[idx].strip()
+                if domain:
+                    yield domain
 
-        # Clean and filter domains
-        domains = df["domain"].dropna().astype(str).str.strip()
-        domains = domains[domains != ""]  # Remove empty strings
+
+def _read_domains_arrow(path: str) -> List[str]:
+    """
+    Read only the 'domain' column with pyarrow and clean it in Arrow buffers
+
+    Falls back to iter_domains for anything Arrow rejects (missing column,
+    empty file, ragged rows) so errors and edge cases match the csv path.
+    """
+    try:
+        table = pacsv.read_csv(
+            path,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=["domain"],
+                column_types={"domain": pa.string()},
+            ),
+        )
+    except (pa.ArrowInvalid, pa.ArrowKeyError, OSError):
+        return list(iter_domains(path))
+
+    domains = pc.utf8_trim_whitespace(table.column("domain"))
+    domains = domains.filter(pc.not_equal(domains, ""))
+    return domains.to_pylist()
+
+
+def _load_clean_domains(path: str) -> List[str]:
+    """Parse, clean and log the domains in a CSV file"""
+    try:
+        pause_gc = gc.isenabled() and os.path.getsize(path) > _GC_PAUSE_THRESHOLD
+        if pause_gc:
+            gc.disable()
+        try:
+            if HAS_PYARROW:
+                domains = _read_domains_arrow(path)
+            else:
+                domains = list(iter_domains(path))
+        finally:
+            if pause_gc:
+                gc.enable()
 
         if len(domains) == 0:
             raise ValueError("No valid domains found in CSV file")
 
         logger.info(f"Loaded {len(domains)} domains from {path}")
-        return "\n".join(domains)
+        return domains
 
     except FileNotFoundError:
         logger.error(f"CSV file not found: {path}")
@@ -49,6 +115,40 @@ def load_domains(path: str) -> str:
         raise
 
 
+@lru_cache(maxsize=16)
+def _cached_load(path: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    """Parsed domains for one version of a file; mtime/size form the cache key"""
+    return tuple(_load_clean_domains(path))
+
+
+def _load_domains_cached(path: str) -> Tuple[str, ...]:
+    """Return cached domains for path, re-parsing only when the file changes"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        logger.error(f"CSV file not found: {path}")
+        raise
+    return _cached_load(path, st.st_mtime_ns, st.st_size)
+
+
+def load_domains(path: str) -> str:
+    """
+    Load domains from CSV file and return as newline-separated string
+
+    Args:
+        path: Path to CSV file with 'domain' column
+
+    Returns:
+        Newline-separated string of domains
+
+    Raises:
+        FileNotFoundError: If CSV file doesn't exist
+        KeyError: If 'domain' column is missing
+        ValueError: If CSV is empty or invalid
+    """
+    return "\n".join(_load_domains_cached(path))
+
+
 def load_domains_list(path: str) -> List[str]:
     """
     Load domains from CSV file and return as list
@@ -59,8 +159,10 @@ def load_domains_list(path: str) -> List[str]:
     Returns:
         List of domain strings
     """
-    domains_str = load_domains(path)
-    return domains_str.split("\n")
+    return list(_load_domains_cached(path))
+
+
+load_domains.cache_clear = _cached_load.cache_clear
 
 
 def validate_domain(domain: str) -> bool:
@@ -73,11 +175,7 @@ def validate_domain(domain: str) -> bool:
     Returns:
         True if domain appears valid
     """
-    import re
-
-    # Basic domain regex pattern
-    pattern = r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$"
-    return bool(re.match(pattern, domain.strip()))
+    return _DOMAIN_RE.match(domain.strip()) is not None
 
 
 def create_sample_csv(path: str, domains: List[str]) -> None:
@@ -88,8 +186,10 @@ def create_sample_csv(path: str, domains: List[str]) -> None:
         path: Output CSV file path
         domains: List of domains to include
     """
-    df = pd.DataFrame({"domain": domains})
-    df.to_csv(path, index=False)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["domain"])
+        writer.writerows([domain] for domain in domains)
     logger.info(f"Created sample CSV with {len(domains)} domains at {path}")
 
 
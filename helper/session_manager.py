@@ -9,7 +9,11 @@ Handles both legacy cookie files and modern storage state files.
 
 import asyncio
 import os
+import re
 import json
+import shutil
+import time
+from functools import cached_property, lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
@@ -29,25 +33,36 @@ except ImportError:
             self._logger = logging.getLogger(name)
             logging.basicConfig(level=logging.INFO)
             
+        def isEnabledFor(self, level):
+            return self._logger.isEnabledFor(level)
+            
         def info(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.INFO):
+                return
             if kwargs:
                 self._logger.info(f"{message} {kwargs}")
             else:
                 self._logger.info(message)
                 
         def debug(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.DEBUG):
+                return
             if kwargs:
                 self._logger.debug(f"{message} {kwargs}")
             else:
                 self._logger.debug(message)
                 
         def warning(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.WARNING):
+                return
             if kwargs:
                 self._logger.warning(f"{message} {kwargs}")
             else:
                 self._logger.warning(message)
                 
         def error(self, message, **kwargs):
+            if not self._logger.isEnabledFor(logging.ERROR):
+                return
             if kwargs:
                 self._logger.error(f"{message} {kwargs}")
             else:
@@ -62,7 +77,7 @@ except ImportError:
     HAS_CRYPTOGRAPHY = False
 
 try:
-    from models import AuthenticationResult, BrowserConfig
+    from models import AuthenticationResult, BrowserConfig, ApolloOutputController
     from exceptions import (
         AuthenticationError, SessionExpiredError, BrowserError,
         ErrorHandler, handle_browser_use_errors
@@ -71,6 +86,14 @@ try:
 except ImportError:
     HAS_ENHANCED_MODELS = False
 
+try:
+    from browser_use import Agent
+    from browser_use.browser.profile import BrowserProfile
+    from browser_use.llm.openai.chat import ChatOpenAI
+    HAS_BROWSER_USE = True
+except ImportError:
+    HAS_BROWSER_USE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -99,15 +122,85 @@ def log_debug(message, **kwargs):
     else:
         print(f"DEBUG: {message} {kwargs if kwargs else ''}")
 
+# Session encryption key, read from disk once per process
+_KEY_CACHE: Optional[bytes] = None
+
+# Environment is stable after load_dotenv, so build the mapping once per process
+@lru_cache(maxsize=1)
+def _sensitive_data_for_env() -> Dict[str, Dict[str, str]]:
+    """Load sensitive data for domain-restricted authentication"""
+    return {
+        "https://app.apollo.io": {
+            "x_apollo_email": os.getenv("APOLLO_EMAIL", ""),
+            "x_apollo_password": os.getenv("APOLLO_PASSWORD", ""),
+            "x_apollo_api_key": os.getenv("APOLLO_API_KEY", "")
+        },
+        "https://accounts.google.com": {
+            "x_google_email": os.getenv("GOOGLE_EMAIL", ""),
+            "x_google_password": os.getenv("GOOGLE_PASSWORD", "")
+        }
+    }
+
+# Chrome flags shared by every session-manager profile, for compatibility and stealth
+_BASE_CHROME_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-ipc-flooding-protection",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-field-trial-config",
+    "--disable-background-timer-throttling",
+    "--disable-gpu",  # Helps with compatibility issues
+    "--disable-software-rasterizer",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-crash-reporter",  # Additional compatibility
+    "--disable-extensions",  # Reduce complexity
+    "--disable-sync",  # No Google account services in automation runs
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+)
+
+# Additional hardening for the secure (validation) profile
+_EXTRA_SECURE_ARGS = (
+    "--disable-plugins",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--no-report-upload",
+    "--disable-features=VizDisplayCompositor,VizService",
+    "--disable-gpu-sandbox",
+    "--enable-features=NetworkService,NetworkServiceLogging",
+    "--ignore-certificate-errors",
+    "--ignore-ssl-errors",
+    "--ignore-certificate-errors-spki-list",
+)
+
+_SECURE_CHROME_ARGS = _BASE_CHROME_ARGS + _EXTRA_SECURE_ARGS
+
+# Apollo-specific error indicators, unioned so one query covers all of them
+_ERROR_INDICATOR_SELECTOR = ", ".join((
+    '[data-cy="error-message"]',
+    '.error-banner',
+    '[class*="rate-limit"]',
+))
+
 class ApolloSessionManager:
     """Manages Apollo.io authentication sessions with security and monitoring"""   
     
     def __init__(self):
+        # One directory scan answers every "does this session file exist" check
+        self._scan_cookie_dir()
+        
         # Prefer verified session over regular session
         verified_path = Path("cookies/verified_storage_state.json")
         regular_path = Path("cookies/storage_state.json")
         
-        if verified_path.exists():
+        if verified_path.name in self._cookie_entries:
             self.storage_state_path = verified_path
             print("🔒 Using verified Chrome session (includes Cloudflare tokens)")
         else:
@@ -118,12 +211,19 @@ class ApolloSessionManager:
         self._encryption_key = self._get_or_create_encryption_key()
         
         # Security configuration
-        self.sensitive_data = self._load_sensitive_data()
         self.allowed_domains = ["*.apollo.io", "accounts.google.com", "*.googleusercontent.com"]
+        # Checked against every step's URL, so match all bare domains in one search
+        self._allowed_url_re = re.compile(
+            "|".join(re.escape(domain.replace("*.", "")) for domain in self.allowed_domains)
+        )
         
         # Performance settings
         self.session_cache = {}
-        self.last_validation = None
+        self._profile_cache = {}
+        
+        # Step-monitor state: last URL already seen at network idle
+        self._last_idle_url = None
+        self._last_validation_ts: Optional[float] = None  # time.monotonic() of last success
         self.validation_interval = 300  # 5 minutes
         
     async def validate_session(self, use_headless=True) -> bool:
@@ -154,10 +254,6 @@ class ApolloSessionManager:
             profile = self._create_secure_browser_profile(auth_config, headless=use_headless)
             
             # Use structured output for validation
-            from browser_use.llm.openai.chat import ChatOpenAI
-            from browser_use import Agent, Controller
-            from models import ApolloOutputController
-            
             llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
             
             # Create agent with structured output and sensitive data protection
@@ -217,17 +313,21 @@ class ApolloSessionManager:
                     context=error_context
                 )
     
-    async def auto_recover_session(self) -> bool:
+    async def auto_recover_session(self, parallel_recovery: bool = True) -> bool:
         """
         Attempt to automatically recover the session
         
+        Args:
+            parallel_recovery: Race the recovery configs in separate browsers;
+                set False to try them one at a time on constrained machines
+        
         Returns:
             bool: True if recovery successful, False if manual login needed
         """
         print("🔄 Attempting session recovery...")
         
-        # First, try validating current session
-        if await self.validate_session():
+        # A recent successful validation needs no browser at all
+        if self._is_cached_validation_valid():
             print("✅ Session is already valid!")
             return True
         
@@ -237,6 +337,14 @@ class ApolloSessionManager:
             print("❌ No authentication available for recovery")
             return False
         
+        # Cache is cold but auth files exist - validate once before recovering
+        try:
+            if await self.validate_session():
+                print("✅ Session is already valid!")
+                return True
+        except AuthenticationError as e:
+            logger.info("Session invalid, trying recovery configs", error=str(e))
+        
         # Try with different browser settings (non-headless, different user agent)
         recovery_configs = [
             {"headless": False, "extra_args": ["--incognito"]},
@@ -244,51 +352,83 @@ class ApolloSessionManager:
             {"headless": False, "extra_args": ["--user-data-dir=" + str(self.profile_dir)]}
         ]
         
-        for i, config in enumerate(recovery_configs):
-            print(f"🔄 Recovery attempt {i+1}/{len(recovery_configs)}")
-            
+        if parallel_recovery:
+            # Each attempt runs in its own browser, so the first success wins
+            tasks = [
+                asyncio.create_task(self._try_recovery(i, len(recovery_configs), config, auth_config))
+                for i, config in enumerate(recovery_configs)
+            ]
             try:
-                profile = self._create_browser_profile(
-                    auth_config, 
-                    headless=config["headless"],
-                    extra_args=config["extra_args"]
-                )
-                
-                # Use Agent for recovery (updated API)
-                from browser_use.llm.openai.chat import ChatOpenAI
-                from browser_use import Agent
-                import os
-                
-                llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
-                agent = Agent(
-                    task="Navigate to https://app.apollo.io/ and check if we're logged in. If you see the main Apollo app interface, return 'RECOVERY_SUCCESS'. If you see the login page, return 'RECOVERY_FAILED'.",
-                    browser_profile=profile,
-                    llm=llm,
-                )
-                
-                result = await agent.run(max_steps=10)
-                
-                if "RECOVERY_SUCCESS" in str(result).upper():
-                    print("✅ Session recovered successfully!")
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    if any(task.result() for task in done):
+                        return True
+            finally:
+                # Cancel the remaining attempts and let their browsers shut down
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        else:
+            for i, config in enumerate(recovery_configs):
+                if await self._try_recovery(i, len(recovery_configs), config, auth_config):
                     return True
-                
-            except Exception as e:
-                print(f"Recovery attempt {i+1} failed: {e}")
-                continue
         
         print("❌ Automatic recovery failed - manual login required")
         return False
     
+    async def _try_recovery(self, i: int, total: int, config: dict, auth_config: dict) -> bool:
+        """Run one recovery attempt, returning True if the session was recovered"""
+        print(f"🔄 Recovery attempt {i+1}/{total}")
+        
+        try:
+            profile = self._create_browser_profile(
+                auth_config, 
+                headless=config["headless"],
+                extra_args=config["extra_args"]
+            )
+            
+            # Use Agent for recovery (updated API)
+            llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
+            agent = Agent(
+                task="Navigate to https://app.apollo.io/ and check if we're logged in. If you see the main Apollo app interface, return 'RECOVERY_SUCCESS'. If you see the login page, return 'RECOVERY_FAILED'.",
+                browser_profile=profile,
+                llm=llm,
+            )
+            
+            result = await agent.run(max_steps=10)
+            
+            if "RECOVERY_SUCCESS" in str(result).upper():
+                print("✅ Session recovered successfully!")
+                return True
+            
+        except Exception as e:
+            print(f"Recovery attempt {i+1} failed: {e}")
+        
+        return False
+    
+    def _scan_cookie_dir(self):
+        """Snapshot the cookies directory entries (name -> os.DirEntry)"""
+        try:
+            with os.scandir("cookies") as it:
+                self._cookie_entries = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            self._cookie_entries = {}
+    
+    def _cookie_entry(self, path: Path):
+        """Scanned entry for a session file in the cookies directory, or None"""
+        return self._cookie_entries.get(path.name)
+    
     def _get_auth_config(self) -> dict:
         """Get the best available authentication configuration"""
         
         # Prefer modern storage state (no user_data_dir conflict)
-        if self.storage_state_path.exists():
+        if self._cookie_entry(self.storage_state_path):
             print(f"📁 Using storage state: {self.storage_state_path}")
             return {"storage_state": str(self.storage_state_path)}
         
         # Fallback to legacy cookies (disable user_data_dir to avoid conflict)
-        elif self.legacy_cookies_path.exists():
+        elif self._cookie_entry(self.legacy_cookies_path):
             print(f"📁 Using legacy cookies: {self.legacy_cookies_path}")
             return {"cookies_file": str(self.legacy_cookies_path.resolve())}
         
@@ -296,62 +436,62 @@ class ApolloSessionManager:
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Get or create encryption key for sensitive data"""
+        global _KEY_CACHE
+        if _KEY_CACHE is not None:
+            return _KEY_CACHE
+        
         key_file = Path("keys/session.key")
         key_file.parent.mkdir(exist_ok=True)
         
         if key_file.exists():
-            return key_file.read_bytes()
+            key = key_file.read_bytes()
         else:
             key = Fernet.generate_key()
             key_file.write_bytes(key)
             os.chmod(key_file, 0o600)  # Read-only for owner
-            return key
+        
+        _KEY_CACHE = key
+        return key
     
-    def _load_sensitive_data(self) -> Dict[str, Dict[str, str]]:
-        """Load sensitive data for domain-restricted authentication"""
-        return {
-            "https://app.apollo.io": {
-                "x_apollo_email": os.getenv("APOLLO_EMAIL", ""),
-                "x_apollo_password": os.getenv("APOLLO_PASSWORD", ""),
-                "x_apollo_api_key": os.getenv("APOLLO_API_KEY", "")
-            },
-            "https://accounts.google.com": {
-                "x_google_email": os.getenv("GOOGLE_EMAIL", ""),
-                "x_google_password": os.getenv("GOOGLE_PASSWORD", "")
-            }
-        }
+    @cached_property
+    def sensitive_data(self) -> Dict[str, Dict[str, str]]:
+        """Sensitive data for domain-restricted authentication, loaded on first use"""
+        return _sensitive_data_for_env()
     
     def _is_cached_validation_valid(self) -> bool:
         """Check if cached validation is still valid"""
-        if not self.last_validation:
-            return False
-        
-        elapsed = (datetime.now() - self.last_validation).total_seconds()
-        return elapsed < self.validation_interval
+        return (
+            self._last_validation_ts is not None
+            and time.monotonic() - self._last_validation_ts < self.validation_interval
+        )
     
     def _cache_validation_result(self, success: bool):
         """Cache validation result with timestamp"""
         if success:
-            self.last_validation = datetime.now()
+            self._last_validation_ts = time.monotonic()
         else:
-            self.last_validation = None
+            self._last_validation_ts = None
     
     async def _validation_step_monitor(self, agent):
         """Monitor validation steps for security and performance"""
         try:
+            # Always ask for the current page: the agent may have switched tabs
+            # (e.g. a Google login popup), and the domain check must see that tab
             page = await agent.browser_session.get_current_page()
             current_url = page.url
             
             # Security monitoring
-            if not any(domain.replace("*.", "") in current_url for domain in self.allowed_domains):
+            if not self._allowed_url_re.search(current_url):
                 logger.warning("Navigation outside allowed domains", url=current_url)
             
-            # Performance monitoring
-            try:
-                await page.wait_for_load_state("networkidle", timeout=5000)
-                logger.debug("Page network idle achieved", url=current_url)
-            except:
-                logger.debug("Page still loading", url=current_url)
+            # Performance monitoring - no need to wait again on a page already seen idle
+            if current_url != self._last_idle_url:
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=5000)
+                    self._last_idle_url = current_url
+                    logger.debug("Page network idle achieved", url=current_url)
+                except:
+                    logger.debug("Page still loading", url=current_url)
                 
         except Exception as e:
             logger.debug("Step monitoring failed", error=str(e))
@@ -361,59 +501,23 @@ class ApolloSessionManager:
         try:
             page = await agent.browser_session.get_current_page()
             
-            # Check for Apollo-specific errors
-            error_indicators = [
-                '[data-cy="error-message"]',
-                '.error-banner',
-                '[class*="rate-limit"]'
-            ]
-            
-            for selector in error_indicators:
-                error_element = await page.query_selector(selector)
-                if error_element:
-                    error_text = await error_element.text_content()
-                    logger.warning("Apollo error detected", error=error_text, url=page.url)
-                    break
+            # Check for Apollo-specific errors in a single round-trip
+            error_element = await page.query_selector(_ERROR_INDICATOR_SELECTOR)
+            if error_element:
+                error_text = await error_element.text_content()
+                logger.warning("Apollo error detected", error=error_text, url=page.url)
                     
         except Exception as e:
             logger.debug("Error handler failed", error=str(e))
     
     def _create_secure_browser_profile(self, auth_config: dict, headless=True, extra_args=None):
         """Create secure browser profile with enhanced anti-detection"""
-        from browser_use.browser.profile import BrowserProfile
-        
-        # Enhanced security args
-        security_args = [
-            "--disable-blink-features=AutomationControlled",
-            "--disable-dev-shm-usage", 
-            "--no-sandbox",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor",
-            "--disable-ipc-flooding-protection",
-            "--disable-renderer-backgrounding",
-            "--disable-backgrounding-occluded-windows",
-            "--disable-field-trial-config",
-            "--disable-background-timer-throttling",
-            "--disable-gpu",
-            "--disable-software-rasterizer",
-            "--no-first-run",
-            "--no-default-browser-check",
-            "--disable-crash-reporter",
-            "--disable-extensions",
-            "--disable-plugins",
-            "--disable-default-apps",
-            "--disable-background-networking",
-            "--disable-sync",
-            "--metrics-recording-only",
-            "--no-report-upload",
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "--disable-features=VizDisplayCompositor,VizService",
-            "--disable-gpu-sandbox",
-            "--enable-features=NetworkService,NetworkServiceLogging",
-            "--ignore-certificate-errors",
-            "--ignore-ssl-errors",
-            "--ignore-certificate-errors-spki-list"
-        ]
+        cache_key = ("secure", tuple(sorted(auth_config.items())), headless, tuple(extra_args or ()))
+        profile = self._profile_cache.get(cache_key)
+        if profile is not None:
+            return profile
+        
+        security_args = list(_SECURE_CHROME_ARGS)
         
         if extra_args:
             security_args.extend(extra_args)
@@ -447,32 +551,21 @@ class ApolloSessionManager:
                     config_keys=list(profile_config.keys()),
                     auth_type=list(auth_config.keys()) if auth_config else [])
         
-        return BrowserProfile(**profile_config)
+        profile = self._profile_cache[cache_key] = BrowserProfile(**profile_config)
+        return profile
 
     def _create_browser_profile(self, auth_config: dict, headless=True, extra_args=None):
         """Create browser profile with authentication and anti-detection settings"""
-        from browser_use.browser.profile import BrowserProfile
-        
-        # Enhanced browser args for compatibility and stealth
-        browser_args = [
-            "--disable-blink-features=AutomationControlled",
-            "--disable-dev-shm-usage", 
-            "--no-sandbox",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor",
-            "--disable-ipc-flooding-protection",
-            "--disable-renderer-backgrounding",
-            "--disable-backgrounding-occluded-windows",
-            "--disable-field-trial-config",
-            "--disable-background-timer-throttling",
-            "--disable-gpu",  # Helps with compatibility issues
-            "--disable-software-rasterizer",
-            "--no-first-run",
-            "--no-default-browser-check",
-            "--disable-crash-reporter",  # Additional compatibility
-            "--disable-extensions",  # Reduce complexity
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
-        ]
+        # Without auth the profile depends on whether profile_dir exists
+        cache_key = (
+            "recovery", tuple(sorted(auth_config.items())), headless, tuple(extra_args or ()),
+            None if auth_config else self.profile_dir.exists(),
+        )
+        profile = self._profile_cache.get(cache_key)
+        if profile is not None:
+            return profile
+        
+        browser_args = list(_BASE_CHROME_ARGS)
         
         if extra_args:
             browser_args.extend(extra_args)
@@ -504,19 +597,22 @@ class ApolloSessionManager:
             if self.profile_dir.exists():
                 profile_config["user_data_dir"] = str(self.profile_dir)
         
-        return BrowserProfile(**profile_config)
+        profile = self._profile_cache[cache_key] = BrowserProfile(**profile_config)
+        return profile
     
     def get_session_info(self) -> dict:
         """Get information about current session files"""
+        storage_entry = self._cookie_entry(self.storage_state_path)
+        legacy_entry = self._cookie_entry(self.legacy_cookies_path)
         info = {
-            "storage_state_exists": self.storage_state_path.exists(),
-            "legacy_cookies_exist": self.legacy_cookies_path.exists(),
+            "storage_state_exists": storage_entry is not None,
+            "legacy_cookies_exist": legacy_entry is not None,
             "profile_dir_exists": self.profile_dir.exists(),
             "recommended_action": None
         }
         
-        if self.storage_state_path.exists():
-            stat = self.storage_state_path.stat()
+        if storage_entry is not None:
+            stat = storage_entry.stat()
             info["storage_state_modified"] = datetime.fromtimestamp(stat.st_mtime)
             info["storage_state_size"] = stat.st_size
             
@@ -526,7 +622,7 @@ class ApolloSessionManager:
             else:
                 info["recommended_action"] = "Session looks good"
         
-        elif self.legacy_cookies_path.exists():
+        elif legacy_entry is not None:
             info["recommended_action"] = "Upgrade to storage_state (recommended) - run helper/create_login_session.py"
         
         else:
@@ -536,19 +632,22 @@ class ApolloSessionManager:
     
     def cleanup_old_sessions(self):
         """Clean up old session files and profile data"""
+        global _KEY_CACHE
         print("🧹 Cleaning up old session data...")
+        self._profile_cache.clear()
+        _KEY_CACHE = None
         
         files_cleaned = 0
         
         # Remove old storage state if exists
-        if self.storage_state_path.exists():
+        if self._cookie_entry(self.storage_state_path):
             self.storage_state_path.unlink()
             files_cleaned += 1
             print(f"🗑️  Removed: {self.storage_state_path}")
+            self._scan_cookie_dir()
         
         # Clean profile directory
         if self.profile_dir.exists():
-            import shutil
             shutil.rmtree(self.profile_dir)
             files_cleaned += 1
             print(f"🗑️  Removed: {self.profile_dir}")
@@ -558,11 +657,11 @@ class ApolloSessionManager:
     def fix_browser_issues(self):
         """Fix common browser issues identified in logs"""
         print("🔧 Fixing browser configuration issues...")
+        self._profile_cache.clear()
         
         # Fix 1: Clean corrupted profile directory
         if self.profile_dir.exists():
             print(f"🗑️  Removing potentially corrupted profile: {self.profile_dir}")
-            import shutil
             shutil.rmtree(self.profile_dir)
         
         # Fix 2: Create fresh profile directory
@@ -1,11 +1,14 @@
 import asyncio
+import csv
 import os
-import pandas as pd
-import json
 import re
+import tempfile
+import weakref
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs, quote
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 from browser_use import Agent, Browser, BrowserConfig, Controller
@@ -14,28 +17,197 @@ from browser_use.browser.context import BrowserContextConfig
 from browser_use.llm.openai.chat import ChatOpenAI
 from apify_client import ApifyClient
 from helper.session_manager import ApolloSessionManager
+from helper.load_domains import load_domains_list
+from serialization import json_dumps, json_loads
+
+# Optional columnar cache for the domain list - graceful fallback to CSV only
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 # --- Environment Setup ---
 load_dotenv()
 
 # --- Configuration and Constants ---
 JOB_TITLES = ["CEO", "CTO", "CFO", "VP Sales", "VP Marketing"]
+# Title filters are fixed, so their query string and display form are built once
+PERSON_TITLES_QUERY = "".join(f"&personTitles[]={quote(title)}" for title in JOB_TITLES)
+JOB_TITLES_CSV = ", ".join(JOB_TITLES)
 APIFY_TOKEN = os.getenv("APIFY_TOKEN")
 ACTOR_ID = "jljBwyyQakqrL1wae"
 DOMAINS_CSV = Path("data/company_domains.csv")
+DOMAINS_PARQUET = DOMAINS_CSV.with_suffix(".parquet")
+
+# Apollo search IDs are 24 hex characters; prefer the one the controller reports
+SEARCH_ID_LABELED_RE = re.compile(r"search ID: ([a-f0-9]{24})")
+SEARCH_ID_RE = re.compile(r"\b([a-f0-9]{24})\b")
+SEARCH_ID_IN_URL_RE = re.compile(r"[?&]qOrganizationSearchListId=([a-f0-9]{24})")
+SEARCH_ID_IN_HASH_JS = "() => /[?&]qOrganizationSearchListId=[a-f0-9]{24}/.test(location.hash)"
+
+# Rows per Arrow chunk when collecting Apify items for the Parquet copy
+PARQUET_CHUNK_ROWS = 1000
+
+# Requests the filter flow never needs; dropping them lets networkidle settle sooner
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCKED_URL_RE = re.compile(
+    r"google-analytics|googletagmanager|doubleclick|segment\.(?:io|com)|intercom|fullstory|hotjar"
+)
+
+# Static console banner, joined once so it is a single write
+_BANNER = "\n".join([
+    "🚀 Apollo.io Contact Extraction Pipeline (Controller Version)",
+    "=" * 60,
+    "This script implements the 11-step process using controller actions:",
+    "1-5. Load domains and paste into Apollo filter",
+    "6-11. Save search and extract organization ID",
+    "=" * 60,
+])
 
 # Create the data directory if it doesn't exist
 DOMAINS_CSV.parent.mkdir(exist_ok=True)
 
+# --- Apollo UI Selectors (ordered by priority; raced by find_first_visible) ---
+COMPANY_SELECTORS = (
+    'text="Companies and Lookalikes"',
+    'button:has-text("Companies")',
+    '[data-cy*="company"]',
+    'text=Company',
+)
+INCLUDE_EXCLUDE_SELECTORS = (
+    'text="Include / exclude list of companies"',
+    'button:has-text("Include / exclude")',
+    'text=Include / exclude',
+    '[data-cy*="include-exclude"]',
+)
+TEXTAREA_SELECTORS = (
+    'textarea[placeholder*="one domain per line"]',
+    'textarea[placeholder*="domain"]',
+    'textarea:below(:text("Include list of companies"))',
+    'textarea',
+)
+SAVE_SEARCH_SELECTORS = (
+    'button:has-text("Save and Search")',
+    'text="Save and Search"',
+    '[data-cy*="save-search"]',
+    'button:has-text("Save")',
+)
+JOB_TITLE_SELECTORS = (
+    'text="Job Titles"',
+    'text="Person Titles"',
+    'text="Title"',
+    '[data-cy*="title"]',
+    'text=Titles',
+)
+TITLE_INPUT_SELECTORS = (
+    'input[placeholder*="title"]',
+    'input[placeholder*="job"]',
+    'input[type="text"]:below(:text("Job Titles"))',
+    'input[type="text"]',
+)
+APPLY_SELECTORS = (
+    'button:has-text("Apply")',
+    'button:has-text("Search")',
+    'button:has-text("Update")',
+)
+
 # --- Helper Function ---
+def load_controller_domains() -> list[str]:
+    """
+    Load the cleaned domain list, preferring a Parquet copy of the CSV.
+
+    The Parquet file is rewritten whenever the CSV is newer, so repeat runs
+    read one compressed column instead of re-parsing the CSV.
+    """
+    if HAS_PYARROW:
+        try:
+            if DOMAINS_PARQUET.stat().st_mtime_ns >= DOMAINS_CSV.stat().st_mtime_ns:
+                return pq.read_table(DOMAINS_PARQUET, columns=["domain"]).column(0).to_pylist()
+        except (OSError, pa.ArrowInvalid):
+            pass  # Missing or unreadable cache - rebuild from the CSV
+    
+    domains_list = load_domains_list(str(DOMAINS_CSV))
+    
+    if HAS_PYARROW:
+        try:
+            pq.write_table(pa.table({"domain": domains_list}), DOMAINS_PARQUET, compression="zstd")
+        except OSError as e:
+            print(f"⚠️ Could not write domain cache {DOMAINS_PARQUET}: {e}")
+    
+    return domains_list
+
+@lru_cache(maxsize=1)
+def _llm() -> ChatOpenAI:
+    """Shared LLM client so its HTTP connection pool outlives a single agent run."""
+    return ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
+
+@lru_cache(maxsize=1)
+def _apify() -> ApifyClient:
+    """Shared Apify client; reuses its HTTP session across actor and dataset calls."""
+    return ApifyClient(token=APIFY_TOKEN)
+
+def build_apollo_url(search_id: str) -> str:
+    """Apify-ready Apollo people URL for a saved organization search plus the job title filters."""
+    return (
+        "https://app.apollo.io/#/people?"
+        "page=1&sortAscending=false&sortByField=%5Bnone%5D"
+        f"&qOrganizationSearchListId={search_id}"
+        f"{PERSON_TITLES_QUERY}"
+    )
+
 def url_encode_job_titles(titles: list[str]) -> list[str]:
     """URL-encodes a list of job titles."""
     return [quote(title) for title in titles]
 
+async def find_first_visible(page, selectors: tuple[str, ...], timeout: int = 5000):
+    """
+    Wait once for any of the selectors to become visible and return a locator
+    for the highest-priority one that is, or None if none appear in time.
+    """
+    race = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        race = race.or_(page.locator(selector))
+    
+    # Filter to visible matches first: broad candidates ('textarea', 'text=Company')
+    # often match hidden elements earlier in the document
+    try:
+        await race.locator("visible=true").first.wait_for(state="visible", timeout=timeout)
+    except Exception:
+        return None
+    
+    # Something is visible; pick by list order rather than document order
+    for selector in selectors:
+        candidate = page.locator(selector).locator("visible=true").first
+        try:
+            if await candidate.is_visible():
+                return candidate
+        except Exception:
+            continue
+    return None
+
+async def _block_nonessential(route):
+    """Route handler that aborts media and third-party tracking requests."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+_routed_contexts = weakref.WeakSet()
+
+async def block_nonessential_requests(page) -> None:
+    """Install the request filter once per browser context (covers later navigations and tabs)."""
+    context = page.context
+    if context in _routed_contexts:
+        return
+    await context.route("**/*", _block_nonessential)
+    _routed_contexts.add(context)
+
 # --- Browser Automation Controller Actions ---
 controller = Controller()
 
-@controller.action('Load and paste domains')
 async def load_and_paste_domains(browser: Browser) -> ActionResult:
     """
     Implements the first part of the 11-step process:
@@ -46,95 +218,57 @@ async def load_and_paste_domains(browser: Browser) -> ActionResult:
     5. Type/paste domain list into text area
     """
     try:
-        # Load domains from CSV
-        if not DOMAINS_CSV.exists():
+        # Reuse the list main() already parsed; load from CSV only when run standalone
+        domains_list = getattr(controller, "domains_list", None)
+        if domains_list is None and not DOMAINS_CSV.exists():
             return ActionResult(
                 extracted_content="❌ Domains CSV file not found",
                 include_in_memory=False
             )
         
-        domains_df = pd.read_csv(DOMAINS_CSV)
-        domains_list = domains_df["domain"].tolist()
-        domains_string = "\n".join(domains_list)
-        
         # Get current page
         page = await browser.get_current_page()
+        await block_nonessential_requests(page)
         
         # Step 1: Navigate to Apollo people search URL
         apollo_url = "https://app.apollo.io/#/people?personTitles[]=CEO&sortByField=%5Bnone%5D&sortAscending=false"
-        await page.goto(apollo_url)
-        await page.wait_for_load_state("networkidle")
+        # Apollo's SPA keeps polling, so networkidle fires late or never; wait for the
+        # element Step 2 needs instead
+        goto_task = asyncio.create_task(page.goto(apollo_url, wait_until="domcontentloaded"))
+        try:
+            if domains_list is None:
+                # Parse the file while the page is loading
+                domains_list = await asyncio.to_thread(load_controller_domains)
+        finally:
+            await goto_task
         
         # Step 2: Click on "Companies and Lookalikes" 
-        company_selectors = [
-            'text="Companies and Lookalikes"',
-            'button:has-text("Companies")',
-            '[data-cy*="company"]',
-            'text*="Company"'
-        ]
-        
-        company_clicked = False
-        for selector in company_selectors:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                await page.click(selector)
-                company_clicked = True
-                break
-            except:
-                continue
-                
-        if not company_clicked:
+        company_button = await find_first_visible(page, COMPANY_SELECTORS, timeout=15000)
+        if company_button:
+            await company_button.click()
+        else:
             return ActionResult(
                 extracted_content="❌ Could not find 'Companies and Lookalikes' button",
                 include_in_memory=False
             )
         
         # Step 3: Click on "Include / exclude list of companies"
-        include_exclude_selectors = [
-            'text="Include / exclude list of companies"',
-            'button:has-text("Include / exclude")',
-            'text*="Include / exclude"',
-            '[data-cy*="include-exclude"]'
-        ]
-        
-        include_clicked = False
-        for selector in include_exclude_selectors:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                await page.click(selector)
-                include_clicked = True
-                break
-            except:
-                continue
-                
-        if not include_clicked:
+        include_button = await find_first_visible(page, INCLUDE_EXCLUDE_SELECTORS)
+        if include_button:
+            await include_button.click()
+        else:
             return ActionResult(
                 extracted_content="❌ Could not find 'Include / exclude list of companies' button",
                 include_in_memory=False
             )
         
         # Step 4: Find and click the text area under "Include list of companies"
-        textarea_selectors = [
-            'textarea[placeholder*="one domain per line"]',
-            'textarea[placeholder*="domain"]',
-            'textarea:below(:text("Include list of companies"))',
-            'textarea'
-        ]
-        
-        textarea_found = False
-        for selector in textarea_selectors:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                await page.click(selector)
-                
-                # Step 5: Type/paste the domain list
-                await page.fill(selector, domains_string)
-                textarea_found = True
-                break
-            except:
-                continue
-                
-        if not textarea_found:
+        textarea = await find_first_visible(page, TEXTAREA_SELECTORS)
+        if textarea:
+            # Step 5: Paste the domain list; fill() focuses the field and inserts the
+            # whole string in one input event, so no separate click is needed
+            await textarea.fill("\n".join(domains_list))
+        else:
             return ActionResult(
                 extracted_content="❌ Could not find textarea for domain input",
                 include_in_memory=False
@@ -151,11 +285,10 @@ async def load_and_paste_domains(browser: Browser) -> ActionResult:
             include_in_memory=False
         )
 
-@controller.action('Save the final output')
 async def save_final_output(browser: Browser) -> ActionResult:
     """
     Implements the final steps of the 11-step process:
-    6. Double-click the "Save and Search" button
+    6. Click the "Save and Search" button (once more if nothing happens)
     7. Wait for URL to update
     8. Extract qOrganizationSearchListId
     9. Add job titles to the search
@@ -166,44 +299,31 @@ async def save_final_output(browser: Browser) -> ActionResult:
         # Get current page
         page = await browser.get_current_page()
         
-        # Step 6: Double-click the "Save and Search" button
-        save_search_selectors = [
-            'button:has-text("Save and Search")',
-            'text="Save and Search"',
-            '[data-cy*="save-search"]',
-            'button:has-text("Save")'
-        ]
-        
-        save_clicked = False
-        for selector in save_search_selectors:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                # Double-click as specified in requirements
-                await page.dblclick(selector)
-                save_clicked = True
-                break
-            except:
-                continue
-                
-        if not save_clicked:
+        # Step 6: Find the "Save and Search" button
+        save_button = await find_first_visible(page, SAVE_SEARCH_SELECTORS)
+        if not save_button:
             return ActionResult(
                 extracted_content="❌ Could not find 'Save and Search' button",
                 include_in_memory=False
             )
         
-        # Step 7: Wait 15 seconds for the page to fully load
-        await page.wait_for_timeout(15000)
+        # Step 7: Click, then wait for the saved search ID to appear in the URL; the
+        # regex runs in-page, so this returns as soon as Apollo redirects. The second
+        # click only happens if the first was swallowed (the old double-click).
+        for _ in range(2):
+            try:
+                await save_button.click()
+                await page.wait_for_function(SEARCH_ID_IN_HASH_JS, timeout=7500)
+                break
+            except Exception:
+                continue  # Retry once; Step 8 reports a missing ID with the current URL
         
         # Step 8: Capture current URL and extract qOrganizationSearchListId
         current_url = page.url
-        parsed_url = urlparse(current_url)
         
-        # The parameter might be in the URL fragment (after #)
-        search_id = None
-        if parsed_url.fragment and '?' in parsed_url.fragment:
-            query_string = parsed_url.fragment.split('?', 1)[1]
-            params = parse_qs(query_string)
-            search_id = params.get('qOrganizationSearchListId', [None])[0]
+        # The parameter lives in the URL fragment (after #), so match it directly
+        search_id_match = SEARCH_ID_IN_URL_RE.search(current_url)
+        search_id = search_id_match.group(1) if search_id_match else None
         
         if not search_id:
             return ActionResult(
@@ -213,87 +333,51 @@ async def save_final_output(browser: Browser) -> ActionResult:
         
         # Step 9: Add job titles to the search
         # Click on job titles/person titles filter
-        job_title_selectors = [
-            'text="Job Titles"',
-            'text="Person Titles"',
-            'text="Title"',
-            '[data-cy*="title"]',
-            'text*="Titles"'
-        ]
-        
-        title_filter_clicked = False
-        for selector in job_title_selectors:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                await page.click(selector)
-                title_filter_clicked = True
-                break
-            except:
-                continue
-        
-        if title_filter_clicked:
+        title_filter = await find_first_visible(page, JOB_TITLE_SELECTORS)
+        try:
+            if title_filter:
+                await title_filter.click()
+        except Exception:
+            title_filter = None
+        
+        if title_filter:
+            # Locate the title input once; the locator re-resolves on each action, so it
+            # stays valid if the field re-renders after a title is added
+            title_input = await find_first_visible(page, TITLE_INPUT_SELECTORS, timeout=3000)
+            
             # Add each job title
             for title in JOB_TITLES:
                 try:
-                    # Look for input field or search box for titles
-                    title_input_selectors = [
-                        'input[placeholder*="title"]',
-                        'input[placeholder*="job"]',
-                        'input[type="text"]:below(:text("Job Titles"))',
-                        'input[type="text"]'
-                    ]
-                    
-                    for input_selector in title_input_selectors:
+                    if title_input:
+                        await title_input.fill(title)
+                        await title_input.press("Enter")
+                    else:
+                        # Alternative: look for checkboxes with title names
+                        checkbox_selector = f'input[type="checkbox"]:near(:text("{title}"))'
                         try:
-                            await page.wait_for_selector(input_selector, timeout=3000)
-                            await page.fill(input_selector, title)
-                            await page.press(input_selector, "Enter")
-                            break
+                            await page.wait_for_selector(checkbox_selector, timeout=2000)
+                            await page.check(checkbox_selector)
                         except:
-                            continue
-                            
-                    # Alternative: look for checkboxes with title names
-                    checkbox_selector = f'input[type="checkbox"]:near(:text("{title}"))'
-                    try:
-                        await page.wait_for_selector(checkbox_selector, timeout=2000)
-                        await page.check(checkbox_selector)
-                    except:
-                        pass
+                            pass
                         
                 except Exception as title_error:
                     print(f"⚠️ Could not add title '{title}': {title_error}")
                     continue
         
         # Step 10: Apply all filters (if there's an apply button)
-        apply_selectors = [
-            'button:has-text("Apply")',
-            'button:has-text("Search")',
-            'button:has-text("Update")'
-        ]
-        
-        for selector in apply_selectors:
+        apply_button = await find_first_visible(page, APPLY_SELECTORS, timeout=3000)
+        if apply_button:
             try:
-                await page.wait_for_selector(selector, timeout=3000)
-                await page.click(selector)
+                await apply_button.click()
                 await page.wait_for_timeout(5000)  # Wait for filters to apply
-                break
-            except:
-                continue
+            except Exception:
+                pass
         
         # Step 11: Get final URL with all filters applied
         final_url = page.url
         
         # Construct the final Apify-ready URL
-        base_url = (
-            "https://app.apollo.io/#/people?"
-            "page=1&sortAscending=false&sortByField=%5Bnone%5D"
-            f"&qOrganizationSearchListId={search_id}"
-        )
-        
-        # Add job titles as URL parameters
-        for title in JOB_TITLES:
-            encoded_title = quote(title)
-            base_url += f"&personTitles[]={encoded_title}"
+        base_url = build_apollo_url(search_id)
         
         return ActionResult(
             extracted_content=f"✅ SUCCESS! Extracted search ID: {search_id}\n"
@@ -308,22 +392,53 @@ async def save_final_output(browser: Browser) -> ActionResult:
             include_in_memory=False
         )
 
+async def run_apollo_filter_pipeline(browser: Browser) -> ActionResult:
+    """
+    Runs all 11 steps in one controller action so the agent needs a single
+    tool call instead of one LLM round-trip per stage.
+    """
+    pasted = await load_and_paste_domains(browser)
+    if not pasted.include_in_memory:
+        return pasted  # Steps 1-5 failed; nothing to save
+    
+    # Let the pasted list settle before saving, without a long fixed wait
+    try:
+        page = await browser.get_current_page()
+        await page.wait_for_load_state("networkidle", timeout=1500)
+    except Exception:
+        pass
+    
+    saved = await save_final_output(browser)
+    return ActionResult(
+        extracted_content=f"{pasted.extracted_content}\n{saved.extracted_content}",
+        include_in_memory=saved.include_in_memory
+    )
+
+controller.action('Load and paste domains')(load_and_paste_domains)
+controller.action('Save the final output')(save_final_output)
+controller.action('Run Apollo filter pipeline')(run_apollo_filter_pipeline)
+
 # --- Main Application Logic ---
 async def main():
     """Main function implementing the controller-based 11-step process."""
     
-    print("🚀 Apollo.io Contact Extraction Pipeline (Controller Version)")
-    print("=" * 60)
-    print("This script implements the 11-step process using controller actions:")
-    print("1-5. Load domains and paste into Apollo filter")
-    print("6-11. Save search and extract organization ID")
-    print("=" * 60)
+    print(_BANNER)
     
     # Step 1: Validate domains file exists
     if not DOMAINS_CSV.exists():
         print(f"❌ Error: Domains file not found at '{DOMAINS_CSV}'. Please create it.")
         return
     
+    # Parse the domains once; the count is reused in the summary
+    try:
+        domains_list = load_controller_domains()
+    except (KeyError, ValueError) as e:
+        print(f"❌ Error: Could not load domains from '{DOMAINS_CSV}': {e}")
+        return
+    num_domains = len(domains_list)
+    # Share the parsed list with the controller actions instead of re-reading it
+    controller.domains_list = domains_list
+    
     # Step 2: Setup authentication
     session_manager = ApolloSessionManager()
     session_manager.fix_browser_issues()
@@ -337,15 +452,15 @@ async def main():
     profile = session_manager._create_browser_profile(auth_config, headless=False)
     
     # Step 4: Setup LLM and Agent with controller
-    llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
+    llm = _llm()
     
     agent = Agent(
         task=(
             "You will execute a precise 11-step Apollo.io automation process using controller actions. "
-            "First, use the 'Load and paste domains' action to handle steps 1-5 (navigate to Apollo, "
-            "click company filters, paste domains). Then use the 'Save the final output' action "
-            "for steps 6-11 (save search, wait for URL update, extract search ID, add job titles). "
-            "Follow the actions exactly as implemented in the controller."
+            "Call the 'Run Apollo filter pipeline' action once; it performs all 11 steps (navigate to "
+            "Apollo, paste domains, save search, extract search ID, add job titles) and reports the result. "
+            "Only if it fails part-way, fall back to the 'Load and paste domains' action for steps 1-5 "
+            "and the 'Save the final output' action for steps 6-11. Then report the result and finish."
         ),
         browser_profile=profile,
         llm=llm,
@@ -353,8 +468,8 @@ async def main():
     )
     
     # Step 5: Execute the automation
-    print("🚀 Starting controller-based automation...")
-    print("📋 Executing 11-step process through controller actions...")
+    print("🚀 Starting controller-based automation...\n"
+          "📋 Executing 11-step process through controller actions...")
     
     try:
         result = await agent.run(max_steps=20)
@@ -364,47 +479,40 @@ async def main():
         print(f"🔍 Agent execution result: {result_str}")
         
         # Look for search ID in the result
-        search_id_match = re.search(r'search ID: ([a-f0-9]{24})', result_str)
+        search_id_match = SEARCH_ID_LABELED_RE.search(result_str)
         if not search_id_match:
-            search_id_match = re.search(r'([a-f0-9]{24})', result_str)
+            search_id_match = SEARCH_ID_RE.search(result_str)
         
         if search_id_match:
             search_id = search_id_match.group(1)
             print(f"✅ Successfully extracted search ID: {search_id}")
             
             # Step 6: Construct final Apify URL
-            apollo_url = (
-                "https://app.apollo.io/#/people?"
-                "page=1&sortAscending=false&sortByField=%5Bnone%5D"
-                f"&qOrganizationSearchListId={search_id}"
-            )
-            
-            # Add job titles
-            for title in JOB_TITLES:
-                encoded_title = quote(title)
-                apollo_url += f"&personTitles[]={encoded_title}"
+            apollo_url = build_apollo_url(search_id)
             
             # Step 7: Display results and run Apify
-            domains_count = len(pd.read_csv(DOMAINS_CSV)["domain"])
-            
-            print(f"\n🎉 AUTOMATION COMPLETED SUCCESSFULLY!")
-            print("=" * 60)
-            print(f"✅ Organization Search ID: {search_id}")
-            print(f"✅ Domains processed: {domains_count}")
-            print(f"✅ Job titles: {', '.join(JOB_TITLES)}")
-            print(f"🔗 Final Apollo URL: {apollo_url}")
-            print("=" * 60)
+            print("\n".join([
+                "\n🎉 AUTOMATION COMPLETED SUCCESSFULLY!",
+                "=" * 60,
+                f"✅ Organization Search ID: {search_id}",
+                f"✅ Domains processed: {num_domains}",
+                f"✅ Job titles: {JOB_TITLES_CSV}",
+                f"🔗 Final Apollo URL: {apollo_url}",
+                "=" * 60,
+            ]))
             
             # Step 8: Run Apify scraper if token available
             if APIFY_TOKEN:
                 await run_apify_scraper(apollo_url)
             else:
-                print("\n📋 MANUAL APIFY INSTRUCTIONS:")
-                print("1. Go to https://console.apify.com/")
-                print("2. Find 'Apollo.io Scraper' actor")
-                print(f"3. Use URL: {apollo_url}")
-                print("4. Set totalRecords: 200")
-                print("5. Run the scraper")
+                print("\n".join([
+                    "\n📋 MANUAL APIFY INSTRUCTIONS:",
+                    "1. Go to https://console.apify.com/",
+                    "2. Find 'Apollo.io Scraper' actor",
+                    f"3. Use URL: {apollo_url}",
+                    "4. Set totalRecords: 200",
+                    "5. Run the scraper",
+                ]))
                 
         else:
             print("❌ Failed to extract search ID from automation result")
@@ -413,6 +521,91 @@ async def main():
     except Exception as e:
         print(f"❌ Error during automation: {str(e)}")
 
+def _arrow_chunk(rows: list[dict]):
+    """Arrow table for a chunk of items, with a column for every key any row has."""
+    # from_pylist takes its schema from the first row only; inferring a struct
+    # array looks at all of them, leaving nulls where a row lacks a key
+    return pa.Table.from_struct_array(pa.array(rows))
+
+def _download_dataset(dataset_id: str, output_file: str) -> None:
+    """Stream an Apify dataset to CSV (plus a Parquet copy) and report a summary."""
+    # Items are spooled to a temporary JSON-lines file, one item in memory at a
+    # time, while the header is collected; items don't all share the same keys
+    row_count = 0
+    companies = set()
+    titles = Counter()
+    fieldnames = {}  # union of item keys, in first-seen order
+    # Items are buffered into Arrow tables in fixed-size chunks so nested fields
+    # (e.g. employment_history) keep their structure in the Parquet output
+    arrow_chunks = []
+    pending = []
+    # Set on the first Arrow error; the Parquet copy is then dropped, not the CSV
+    parquet_error = None if HAS_PYARROW else "pyarrow not installed"
+    
+    with tempfile.TemporaryFile("w+b") as spool:
+        for item in _apify().dataset(dataset_id).iterate_items():
+            fieldnames.update(dict.fromkeys(item))
+            spool.write(json_dumps(item, default=str) + b"\n")
+            row_count += 1
+            
+            if parquet_error is None:
+                pending.append(item)
+                if len(pending) >= PARQUET_CHUNK_ROWS:
+                    try:
+                        arrow_chunks.append(_arrow_chunk(pending))
+                    except (TypeError, pa.ArrowException) as e:
+                        # e.g. a field that is a string in one row and a dict in another
+                        parquet_error = e
+                        arrow_chunks.clear()
+                    pending.clear()
+            
+            company = item.get("organization_name")
+            if company is not None:
+                companies.add(company)
+            title = item.get("title")
+            if title:
+                titles[title] += 1
+        
+        if row_count:
+            # Second pass with the complete header; rows missing a column get ""
+            spool.seek(0)
+            with open(output_file, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(fieldnames), restval="")
+                writer.writeheader()
+                writer.writerows(json_loads(line) for line in spool)
+    
+    if row_count:
+        print(f"🎉 Downloaded {row_count} contacts")
+        print(f"💾 Saved to: {output_file}")
+        
+        if parquet_error is None:
+            # Compact, typed copy for downstream ETL; chunks inferred separately are
+            # unified here (e.g. an all-null column in one chunk, strings in another)
+            parquet_file = output_file.replace(".csv", ".parquet")
+            try:
+                if pending:
+                    arrow_chunks.append(_arrow_chunk(pending))
+                table = pa.concat_tables(arrow_chunks, promote_options="permissive")
+                # Same columns, in the same order, as the CSV header
+                if set(table.column_names) != fieldnames.keys():
+                    raise ValueError("Parquet columns do not match the CSV header")
+                table = table.select(list(fieldnames))
+                pq.write_table(table, parquet_file, compression="zstd")
+                print(f"💾 Parquet saved to: {parquet_file}")
+            except (OSError, TypeError, ValueError, pa.ArrowException) as e:
+                print(f"⚠️ Could not write Parquet copy: {e}")
+        elif HAS_PYARROW:
+            print(f"⚠️ Could not write Parquet copy: {parquet_error}")
+        
+        if "organization_name" in fieldnames:
+            print(f"🏢 Companies found: {len(companies)}")
+        
+        if titles:
+            top_titles = ", ".join(f"{title} ({count})" for title, count in titles.most_common(5))
+            print(f"👔 Top titles: {top_titles}")
+    else:
+        print("⚠️ No contacts found")
+
 async def run_apify_scraper(apollo_url: str):
     """Run the Apify scraper with the constructed URL."""
     try:
@@ -424,31 +617,24 @@ async def run_apify_scraper(apollo_url: str):
             "fileName": "Apollo Prospects"
         }
         
-        apify_client = ApifyClient(token=APIFY_TOKEN)
-        run = apify_client.actor(ACTOR_ID).call(run_input=run_input)
+        apify_client = _apify()
+        run = await asyncio.to_thread(apify_client.actor(ACTOR_ID).start, run_input=run_input)
+        print(f"🆔 Apify run started: {run['id']}")
+        
+        # Resolve the output path up front so download starts the moment the run ends
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = f"apollo_contacts_controller_{timestamp}.csv"
+        
+        # Wait for the actor in a worker thread so the event loop stays free
+        run = await asyncio.to_thread(apify_client.run(run["id"]).wait_for_finish) or run
         
         if run["status"] == "SUCCEEDED":
-            dataset_id = run["data"]["datasetId"]
+            dataset_id = run["defaultDatasetId"]
             print(f"✅ Scraping completed successfully!")
             
-            # Download and save results
-            dataset_items = apify_client.dataset(dataset_id).list_items()
+            # Dataset paging and file writes are blocking I/O - keep them off the event loop
+            await asyncio.to_thread(_download_dataset, dataset_id, output_file)
             
-            if dataset_items.items:
-                contacts_df = pd.DataFrame(dataset_items.items)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"apollo_contacts_controller_{timestamp}.csv"
-                contacts_df.to_csv(output_file, index=False)
-                
-                print(f"🎉 Downloaded {len(contacts_df)} contacts")
-                print(f"💾 Saved to: {output_file}")
-                
-                if 'organization_name' in contacts_df.columns:
-                    unique_companies = contacts_df['organization_name'].nunique()
-                    print(f"🏢 Companies found: {unique_companies}")
-            else:
-                print("⚠️ No contacts found")
-                
         else:
             print(f"❌ Apify run failed: {run['status']}")
             
@@ -3,32 +3,40 @@ Pydantic models for structured output in Apollo.io automation
 Following browser-use best practices for type-safe data extraction
 """
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import re
 
+# Compiled once; validators run for every contact constructed
+_EMAIL_RE = re.compile(r'^[^@]+@[^@]+\.[^@]+$')
+
 
 class Contact(BaseModel):
     """Individual contact information extracted from Apollo.io"""
+    # Apify rows carry many more keys than this model; drop them silently
+    model_config = ConfigDict(extra='ignore')
+    
     first_name: str = Field(description="Contact's first name")
     last_name: str = Field(description="Contact's last name")
-    email: Optional[str] = Field(description="Contact's email address")
-    sanitized_phone: Optional[str] = Field(description="Contact's phone number")
+    email: Optional[str] = Field(default=None, description="Contact's email address")
+    sanitized_phone: Optional[str] = Field(default=None, description="Contact's phone number")
     title: str = Field(description="Job title")
     organization_name: str = Field(description="Company name")
-    linkedin_url: Optional[str] = Field(description="LinkedIn profile URL")
+    linkedin_url: Optional[str] = Field(default=None, description="LinkedIn profile URL")
     employment_history: Optional[List[Dict[str, Any]]] = Field(
         default=[], description="Array of work experiences"
     )
     
-    @validator('email')
+    @field_validator('email')
+    @classmethod
     def validate_email(cls, v):
-        if v and not re.match(r'^[^@]+@[^@]+\.[^@]+$', v):
+        if v and not _EMAIL_RE.match(v):
             raise ValueError('Invalid email format')
         return v
     
-    @validator('linkedin_url')
+    @field_validator('linkedin_url')
+    @classmethod
     def validate_linkedin_url(cls, v):
         if v and not v.startswith(('https://linkedin.com', 'https://www.linkedin.com')):
             raise ValueError('Invalid LinkedIn URL format')
@@ -44,7 +52,8 @@ class ContactList(BaseModel):
     job_titles_searched: List[str] = Field(description="Job titles included in search")
     extraction_timestamp: datetime = Field(default_factory=datetime.now)
     
-    @validator('search_id')
+    @field_validator('search_id')
+    @classmethod
     def validate_search_id(cls, v):
         if not v or len(v) < 10:
             raise ValueError('Invalid search ID format')
@@ -54,11 +63,11 @@ class ContactList(BaseModel):
 class SearchResult(BaseModel):
     """Apollo.io search operation result"""
     success: bool = Field(description="Whether the search was successful")
-    search_id: Optional[str] = Field(description="Extracted qOrganizationSearchListId")
+    search_id: Optional[str] = Field(default=None, description="Extracted qOrganizationSearchListId")
     url: str = Field(description="Final Apollo URL with search parameters")
     domains_applied: List[str] = Field(description="Domains successfully applied to filter")
     job_titles_applied: List[str] = Field(description="Job titles applied to search")
-    error_message: Optional[str] = Field(description="Error details if search failed")
+    error_message: Optional[str] = Field(default=None, description="Error details if search failed")
     execution_time_seconds: float = Field(description="Time taken for search operation")
 
 
@@ -66,12 +75,13 @@ class AuthenticationResult(BaseModel):
     """Apollo.io authentication validation result"""
     authenticated: bool = Field(description="Whether user is logged in")
     session_type: str = Field(description="Type of session (storage_state, cookies, manual)")
-    session_file_path: Optional[str] = Field(description="Path to session file")
+    session_file_path: Optional[str] = Field(default=None, description="Path to session file")
     auth_domains: List[str] = Field(description="Domains with authentication")
-    expires_at: Optional[datetime] = Field(description="Session expiration time")
+    expires_at: Optional[datetime] = Field(default=None, description="Session expiration time")
     validation_timestamp: datetime = Field(default_factory=datetime.now)
     
-    @validator('session_type')
+    @field_validator('session_type')
+    @classmethod
     def validate_session_type(cls, v):
         valid_types = ['storage_state', 'cookies_file', 'manual_login', 'unknown']
         if v not in valid_types:
@@ -84,8 +94,8 @@ class BrowserConfig(BaseModel):
     headless: bool = Field(default=False, description="Run browser in headless mode")
     stealth: bool = Field(default=True, description="Enable stealth mode")
     allowed_domains: List[str] = Field(description="Domains allowed for navigation")
-    user_data_dir: Optional[str] = Field(description="Browser profile directory")
-    storage_state: Optional[str] = Field(description="Path to storage state file")
+    user_data_dir: Optional[str] = Field(default=None, description="Browser profile directory")
+    storage_state: Optional[str] = Field(default=None, description="Path to storage state file")
     wait_for_network_idle: float = Field(default=10.0, description="Network idle timeout")
     viewport_width: int = Field(default=1920, description="Browser viewport width")
     viewport_height: int = Field(default=1080, description="Browser viewport height")
@@ -128,13 +138,13 @@ class DomainFilterResult(BaseModel):
 class ApifyScrapingResult(BaseModel):
     """Result from Apify scraping operation"""
     success: bool = Field(description="Whether scraping completed successfully")
-    dataset_id: Optional[str] = Field(description="Apify dataset ID")
+    dataset_id: Optional[str] = Field(default=None, description="Apify dataset ID")
     total_records: int = Field(description="Total number of records scraped")
     url_scraped: str = Field(description="Apollo URL that was scraped")
     scraping_duration_seconds: float = Field(description="Time taken to scrape")
-    apify_run_id: Optional[str] = Field(description="Apify run ID for tracking")
-    cost_credits: Optional[float] = Field(description="Apify credits consumed")
-    error_details: Optional[str] = Field(description="Error details if scraping failed")
+    apify_run_id: Optional[str] = Field(default=None, description="Apify run ID for tracking")
+    cost_credits: Optional[float] = Field(default=None, description="Apify credits consumed")
+    error_details: Optional[str] = Field(default=None, description="Error details if scraping failed")
 
 
 # Output format controllers for browser-use agents
@@ -4,28 +4,98 @@ Following browser-use best practices for observability and debugging
 """
 
 import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import re
 import time
-import json
+import weakref
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-import structlog
-from urllib.parse import urlparse
+from urllib.parse import SplitResult, urlsplit
 
 from browser_use import Agent
 from exceptions import RateLimitError, CloudflareError, AuthenticationError
+from serialization import json_dumps
+
+# Monitoring records are queued on the calling thread and written to the file and
+# stderr by a background listener, so step hooks never block on log I/O
+MONITORING_LOG_FILE = Path("logs/monitoring/apollo.log")
+MONITORING_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+# Per-step navigation and performance records, one JSON object per line
+MONITORING_EVENTS_FILE = Path("logs/monitoring/events.jsonl")
+EVENTS_FILE_MAX_BYTES = 50 * 1024 * 1024
+EVENTS_FILE_BACKUPS = 5
+
+# Level for the monitoring logger; DEBUG matches structlog's default output
+MONITORING_LOG_LEVEL = os.getenv("APOLLO_MONITORING_LOG_LEVEL", "DEBUG").upper()
+
+_log_queue = queue.Queue()
+_stdlib_logger = logging.getLogger("apollo.monitoring")
+_stdlib_logger.setLevel(MONITORING_LOG_LEVEL)
+_stdlib_logger.addHandler(QueueHandler(_log_queue))
+_stdlib_logger.propagate = False
+
+_log_formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+_file_handler = logging.FileHandler(MONITORING_LOG_FILE)
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+# Event records share the queue and listener but only go to the JSONL file
+_events_logger = logging.getLogger("apollo.monitoring.events")
+_events_logger.setLevel(logging.INFO)
+_events_logger.addHandler(QueueHandler(_log_queue))
+_events_logger.propagate = False
+
+_events_handler = RotatingFileHandler(
+    MONITORING_EVENTS_FILE, maxBytes=EVENTS_FILE_MAX_BYTES, backupCount=EVENTS_FILE_BACKUPS
+)
+_events_handler.setFormatter(logging.Formatter("%(message)s"))
+_events_handler.addFilter(lambda record: record.name == _events_logger.name)
+_file_handler.addFilter(lambda record: record.name != _events_logger.name)
+_stream_handler.addFilter(lambda record: record.name != _events_logger.name)
+
+_log_listener = QueueListener(_log_queue, _file_handler, _stream_handler, _events_handler)
+_log_listener.start()
+
+
+def flush_logs() -> None:
+    """Drain queued monitoring records and stop the background writer"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+atexit.register(flush_logs)
+
+
+def _emit_event(kind: str, record: Dict[str, Any]) -> None:
+    """Queue one event line for MONITORING_EVENTS_FILE"""
+    _events_logger.info(json_dumps({"event": kind, **record}, default=str).decode("utf-8"))
 
 # Setup structured logging
 try:
     import structlog
-    logger = structlog.get_logger("apollo.monitoring")
+    # Render key/value events to a string and hand them to the queued stdlib logger
+    logger = structlog.wrap_logger(
+        _stdlib_logger,
+        processors=[structlog.processors.KeyValueRenderer(key_order=["event"])],
+    )
 except ImportError:
-    import logging
-    
     class LoggerWrapper:
-        def __init__(self, name):
-            self._logger = logging.getLogger(name)
-            logging.basicConfig(level=logging.INFO)
+        def __init__(self, stdlib_logger):
+            # Same queued logger as the structlog path, so output and level match
+            self._logger = stdlib_logger
             
         def info(self, message, **kwargs):
             if kwargs:
@@ -51,7 +121,215 @@ except ImportError:
             else:
                 self._logger.error(message)
     
-    logger = LoggerWrapper("apollo.monitoring")
+    logger = LoggerWrapper(_stdlib_logger)
+
+# Routine per-step DEBUG lines are emitted for one step in every N
+DEBUG_SAMPLE_EVERY = max(1, int(os.getenv("APOLLO_DEBUG_EVERY", "10")))
+
+# Caps that keep per-session metrics bounded on long runs; the full navigation
+# and performance streams go to MONITORING_EVENTS_FILE
+MAX_PAGES_VISITED = 5000
+REPORT_NAVIGATION_ENTRIES = 10
+MAX_PERFORMANCE_ISSUES = 100
+SLOW_LOAD_MS = 10000
+
+
+def _canonical_url(parts: SplitResult) -> str:
+    """
+    URL without query parameters, for counting distinct pages
+    
+    Apollo routes live in the fragment (#/people?...), so the fragment's route
+    is kept and only its query string is dropped.
+    """
+    route = parts.fragment.split("?", 1)[0]
+    canonical = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    return f"{canonical}#{route}" if route else canonical
+
+def _iso_from_ns(ts_ns: int) -> str:
+    """Local ISO timestamp for a time.time_ns() value, formatted only when reported"""
+    return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+
+
+@dataclass(slots=True)
+class SecurityAlert:
+    """Security event recorded during a session"""
+    type: str
+    url: str
+    ts_ns: int
+    step: Optional[int] = None
+    indicator: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "url": self.url,
+            "timestamp": _iso_from_ns(self.ts_ns),
+            "step": self.step,
+            "indicator": self.indicator,
+        }
+
+
+@dataclass(slots=True)
+class NavigationEntry:
+    """One page seen by the step hooks"""
+    step: int
+    url: str
+    ts_ns: int
+    action: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "url": self.url,
+            "timestamp": _iso_from_ns(self.ts_ns),
+            "action": self.action,
+        }
+
+
+# Per-URL memo size for state and domain checks
+URL_CACHE_SIZE = 1024
+
+ALLOWED_DOMAINS = ("apollo.io", "google.com", "googleusercontent.com")
+# Subdomains of an allowed domain; a suffix match rejects look-alike hosts
+_ALLOWED_SUFFIXES = tuple(f".{domain}" for domain in ALLOWED_DOMAINS)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _is_allowed_url(url: str) -> bool:
+    """Check if URL is in allowed domains (pure, so memoized per URL)"""
+    # hostname drops userinfo and port, so "apollo.io@evil.com" is not a match
+    domain = urlsplit(url).hostname or ""
+    return domain in ALLOWED_DOMAINS or domain.endswith(_ALLOWED_SUFFIXES)
+
+# Indicators are CSS selectors, or "text=<needle>" for a case-insensitive match
+# against the page text. Order matters: the first match is the one reported.
+SECURITY_PROBES = {
+    "cloudflare": (
+        '[class*="cf-"]',
+        '[id*="cf-"]',
+        'text=Cloudflare',
+        'text=Please wait while we check your browser',
+    ),
+    "rate_limit": (
+        '[class*="rate-limit"]',
+        '[class*="Rate-limit"]',
+        'text=rate limit',
+        'text=too many requests',
+    ),
+    "auth": (
+        'input[type="password"]',
+        'text=Sign in',
+        'text=Log in',
+        '[data-cy="login"]',
+    ),
+}
+
+# Apollo-specific error selectors; each reports its first element with text
+ERROR_SELECTORS = (
+    '[data-cy="error-message"]',
+    '.error-banner',
+    '.alert-danger',
+    '[class*="error"]',
+    '[role="alert"]',
+)
+
+# UI expected once a state's page has loaded, keyed by Apollo state
+STATE_PROBES = {
+    "filtered_search": (
+        '[data-cy*="filter"]',
+        '.filter-applied',
+        '[class*="active-filter"]',
+    ),
+    "people_search": (
+        '[data-cy="search-results"]',
+        '.search-results',
+        '[class*="prospect"]',
+    ),
+}
+
+# Runs every probe in one page.evaluate instead of one query_selector round trip each
+PROBE_JS = """
+({probes, errorSelectors}) => {
+    let bodyText = null;
+    const matches = (indicator) => {
+        if (indicator.startsWith('text=')) {
+            if (bodyText === null) {
+                bodyText = document.body ? document.body.innerText.toLowerCase() : '';
+            }
+            return bodyText.includes(indicator.slice(5).toLowerCase());
+        }
+        return document.querySelector(indicator) !== null;
+    };
+    
+    const found = {};
+    for (const [key, indicators] of Object.entries(probes)) {
+        found[key] = indicators.find(matches) || null;
+    }
+    
+    const errors = [];
+    for (const selector of errorSelectors) {
+        for (const element of document.querySelectorAll(selector)) {
+            const text = (element.textContent || '').trim();
+            if (text) {
+                errors.push({selector, text});
+                break;
+            }
+        }
+    }
+    return {found, errors};
+}
+"""
+
+# Everything the hooks read from window.performance, fetched in one evaluate
+PERF_PROBE_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paint = {};
+    for (const entry of performance.getEntriesByType('paint')) {
+        paint[entry.name] = entry.startTime;
+    }
+    return {
+        readyState: document.readyState,
+        navigation: nav ? {
+            startTime: nav.startTime,
+            responseStart: nav.responseStart,
+            domContentLoadedEventEnd: nav.domContentLoadedEventEnd,
+            loadEventEnd: nav.loadEventEnd
+        } : null,
+        paint,
+        memory: 'memory' in performance ? {
+            used: performance.memory.usedJSHeapSize,
+            total: performance.memory.totalJSHeapSize,
+            limit: performance.memory.jsHeapSizeLimit
+        } : null
+    };
+}
+"""
+
+
+# Apollo states worth a debug screenshot whenever they are reached
+SCREENSHOT_STATES = frozenset({"filtered_search", "authentication_page"})
+
+# Screenshot limits for error storms
+SCREENSHOTS_PER_MINUTE = 10
+ERROR_SCREENSHOT_DEDUP_SECONDS = 30
+
+# A banner still showing this many steps after it was reported is reported again
+ERROR_REPEAT_STEPS = 5
+MAX_SEEN_ERRORS = 128
+
+MONITORING_DIRS = ("logs/monitoring", "screenshots/debug", "reports/performance")
+_DIRS_READY = False
+
+
+def setup_monitoring_directories() -> None:
+    """Create directories for monitoring outputs (once per process)"""
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    for dir_path in MONITORING_DIRS:
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
+    _DIRS_READY = True
 
 
 class ApolloMonitoringSystem:
@@ -60,16 +338,17 @@ class ApolloMonitoringSystem:
     Implements all browser-use lifecycle hooks with Apollo-specific intelligence
     """
     
-    def __init__(self):
+    def __init__(self, watch_thresholds: bool = True):
         self.metrics = {
             "session_start": datetime.now(),
             "steps_executed": 0,
-            "pages_visited": set(),
+            "pages_visited": OrderedDict(),  # canonical URL -> None, oldest first
             "errors_detected": 0,
             "apollo_states_encountered": {},
-            "performance_data": [],
+            "performance_issues": deque(maxlen=MAX_PERFORMANCE_ISSUES),  # slow loads only
+            "slowest_load_ms": 0,
             "security_alerts": [],
-            "navigation_history": []
+            "navigation_history": deque(maxlen=REPORT_NAVIGATION_ENTRIES)
         }
         
         self.apollo_state_map = {
@@ -81,14 +360,51 @@ class ApolloMonitoringSystem:
             "qOrganizationSearchListId": "filtered_search"
         }
         
+        # One compiled matcher for the whole map. Alternatives are tried in map order,
+        # each scanning the URL lazily, so the first pattern listed still wins
+        self._state_re = re.compile(
+            "|".join(
+                f".*?(?P<g{i}>{re.escape(pattern)})"
+                for i, pattern in enumerate(self.apollo_state_map)
+            ),
+            re.DOTALL,
+        )
+        self._state_by_group = {
+            f"g{i}": state for i, state in enumerate(self.apollo_state_map.values())
+        }
+        self._state_cache: Dict[str, Optional[str]] = {}
+        
+        # The URL only changes on navigation, so the last split is usually reusable
+        self._last_url: Optional[str] = None
+        self._last_parsed: Optional[SplitResult] = None
+        
+        # console.error messages, filled by a listener attached once per page
+        self._console_errors = deque(maxlen=100)
+        self._watched_pages = weakref.WeakSet()
+        
+        # Background screenshots, limited per minute and de-duplicated per error text
+        self._screenshot_tasks = set()
+        self._shot_budget = SCREENSHOTS_PER_MINUTE
+        self._shot_reset = time.monotonic() + 60
+        self._error_shot_times: "OrderedDict[str, float]" = OrderedDict()  # oldest first
+        
+        # Error text digest -> step it was last reported on, oldest first
+        self._seen_errors: "OrderedDict[bytes, int]" = OrderedDict()
+        
+        # Sampler for routine per-step DEBUG output
+        self._dbg_counter = 0
+        self._dbg_every = DEBUG_SAMPLE_EVERY
+        
+        # Slow-load / high-memory warnings; when off, step end only reads
+        # performance data on sampled DEBUG steps
+        self._watch_thresholds = watch_thresholds
+        
         # Create monitoring directories
         self.setup_monitoring_directories()
     
     def setup_monitoring_directories(self):
         """Create directories for monitoring outputs"""
-        dirs = ["logs/monitoring", "screenshots/debug", "reports/performance"]
-        for dir_path in dirs:
-            Path(dir_path).mkdir(parents=True, exist_ok=True)
+        setup_monitoring_directories()
     
     async def step_start_monitor(self, agent: Agent) -> None:
         """
@@ -101,14 +417,25 @@ class ApolloMonitoringSystem:
             
             page = await agent.browser_session.get_current_page()
             current_url = page.url
+            self._watch_console(page)
             
             # Navigation tracking
-            self.metrics["pages_visited"].add(current_url)
-            self.metrics["navigation_history"].append({
-                "step": self.metrics["steps_executed"],
-                "url": current_url,
-                "timestamp": datetime.now().isoformat(),
-                "action": "step_start"
+            pages_visited = self.metrics["pages_visited"]
+            pages_visited[_canonical_url(self._parsed(current_url))] = None
+            if len(pages_visited) > MAX_PAGES_VISITED:
+                pages_visited.popitem(last=False)
+            nav_entry = NavigationEntry(
+                step=self.metrics["steps_executed"],
+                url=current_url,
+                ts_ns=time.time_ns(),
+                action="step_start",
+            )
+            self.metrics["navigation_history"].append(nav_entry)
+            _emit_event("navigation", {
+                "step": nav_entry.step,
+                "url": nav_entry.url,
+                "ts_ns": nav_entry.ts_ns,
+                "action": nav_entry.action,
             })
             
             # Apollo state detection
@@ -124,22 +451,27 @@ class ApolloMonitoringSystem:
             
             # Performance monitoring
             try:
-                # Check if page is still loading
-                loading_state = await page.evaluate("document.readyState")
-                network_requests = await page.evaluate("""
-                    () => performance.getEntriesByType('navigation')[0] || {}
-                """)
+                # Loading state and navigation timing in one round trip
+                perf = await page.evaluate(PERF_PROBE_JS)
+                navigation = perf["navigation"] or {}
                 
                 perf_data = {
                     "step": self.metrics["steps_executed"],
                     "url": current_url,
-                    "loading_state": loading_state,
+                    "loading_state": perf["readyState"],
                     "timestamp": step_start_time,
-                    "dom_ready": network_requests.get("domContentLoadedEventEnd", 0),
-                    "load_complete": network_requests.get("loadEventEnd", 0)
+                    "dom_ready": navigation.get("domContentLoadedEventEnd", 0),
+                    "load_complete": navigation.get("loadEventEnd", 0)
                 }
                 
-                self.metrics["performance_data"].append(perf_data)
+                _emit_event("performance", perf_data)
+                
+                # Only the running maximum and slow loads are kept for the report
+                load_complete = perf_data["load_complete"]
+                if load_complete > self.metrics["slowest_load_ms"]:
+                    self.metrics["slowest_load_ms"] = load_complete
+                if load_complete > SLOW_LOAD_MS:
+                    self.metrics["performance_issues"].append(perf_data)
                 
             except Exception as perf_error:
                 logger.debug("Performance monitoring failed", error=str(perf_error))
@@ -149,12 +481,12 @@ class ApolloMonitoringSystem:
             
             # Domain validation
             if not self._is_allowed_domain(current_url):
-                security_alert = {
-                    "type": "unauthorized_navigation",
-                    "url": current_url,
-                    "step": self.metrics["steps_executed"],
-                    "timestamp": datetime.now().isoformat()
-                }
+                security_alert = SecurityAlert(
+                    type="unauthorized_navigation",
+                    url=current_url,
+                    ts_ns=time.time_ns(),
+                    step=self.metrics["steps_executed"],
+                )
                 self.metrics["security_alerts"].append(security_alert)
                 
                 logger.warning("Navigation to unauthorized domain", 
@@ -178,143 +510,173 @@ class ApolloMonitoringSystem:
             page = await agent.browser_session.get_current_page()
             current_url = page.url
             
+            # One sampling decision per step keeps that step's DEBUG lines together
+            emit_debug = self._should_emit_debug()
+            
+            # The DOM probe and the performance probe are independent, so both
+            # round trips are in flight at once. The performance probe is skipped
+            # when neither the threshold warnings nor a DEBUG line would use it
+            current_state = self._detect_apollo_state(current_url)
+            state_probes = {current_state: STATE_PROBES[current_state]} if current_state in STATE_PROBES else {}
+            if self._watch_thresholds or emit_debug:
+                probe, perf = await asyncio.gather(
+                    self._probe_page(page, state_probes, ERROR_SELECTORS),
+                    page.evaluate(PERF_PROBE_JS),
+                    return_exceptions=True,
+                )
+            else:
+                (probe,) = await asyncio.gather(
+                    self._probe_page(page, state_probes, ERROR_SELECTORS),
+                    return_exceptions=True,
+                )
+                perf = None
+            
+            if isinstance(probe, Exception):
+                logger.debug("DOM probe failed", error=str(probe))
+                probe = {"found": {}, "errors": []}
+            if isinstance(perf, Exception):
+                logger.debug("Performance probe failed", error=str(perf))
+                perf = None
+            
             # Error detection and handling
-            await self._detect_and_handle_errors(page, agent)
+            await self._detect_and_handle_errors(page, agent, probe["errors"])
             
             # State transition validation
-            await self._validate_state_transitions(page)
+            await self._validate_state_transitions(page, current_state, probe["found"])
             
-            # Conditional screenshot capture
+            # Conditional screenshot capture (after errors_detected is updated)
             await self._conditional_screenshot(page, agent)
             
-            # Performance analysis
-            await self._analyze_step_performance(page)
-            
-            # Memory usage monitoring (if available)
-            await self._monitor_memory_usage(page)
+            if perf:
+                # Performance analysis
+                self._analyze_step_performance(current_url, perf, emit_debug)
+                
+                # Memory usage monitoring (if available)
+                self._monitor_memory_usage(perf, emit_debug)
             
-            logger.debug("Step end monitoring completed", 
-                        step=self.metrics["steps_executed"],
-                        url=current_url)
+            if emit_debug:
+                logger.debug("Step end monitoring completed", 
+                            step=self.metrics["steps_executed"],
+                            url=current_url)
                         
         except Exception as e:
             logger.error("Step end monitoring failed", error=str(e))
     
+    def _should_emit_debug(self) -> bool:
+        """True when DEBUG is enabled and this step falls on the sampling interval"""
+        if not _stdlib_logger.isEnabledFor(logging.DEBUG):
+            return False
+        self._dbg_counter += 1
+        return self._dbg_counter % self._dbg_every == 0
+    
+    def _watch_console(self, page) -> None:
+        """Attach the console error listener the first time a page is seen"""
+        if page in self._watched_pages:
+            return
+        page.on("console", self._on_console_message)
+        self._watched_pages.add(page)
+    
+    def _on_console_message(self, message) -> None:
+        if message.type == "error":
+            self._console_errors.append(message.text)
+    
+    def _parsed(self, url: str) -> SplitResult:
+        """urlsplit() of url, reused while the page stays on the same URL"""
+        if url != self._last_url:
+            self._last_url = url
+            self._last_parsed = urlsplit(url)
+        return self._last_parsed
+    
     def _detect_apollo_state(self, url: str) -> Optional[str]:
         """Detect current Apollo.io application state"""
-        for pattern, state in self.apollo_state_map.items():
-            if pattern in url:
-                return state
-        return None
+        # Start and end hooks see the same URL, so most lookups are cache hits
+        try:
+            return self._state_cache[url]
+        except KeyError:
+            pass
+        
+        match = self._state_re.match(url)
+        state = self._state_by_group[match.lastgroup] if match else None
+        if len(self._state_cache) >= URL_CACHE_SIZE:
+            self._state_cache.clear()
+        self._state_cache[url] = state
+        return state
     
     def _is_allowed_domain(self, url: str) -> bool:
         """Check if URL is in allowed domains"""
-        allowed_domains = ["apollo.io", "google.com", "googleusercontent.com"]
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
-        
-        return any(allowed in domain for allowed in allowed_domains)
+        return _is_allowed_url(url)
+    
+    async def _probe_page(self, page, probes: Dict[str, tuple], error_selectors: tuple = ()) -> Dict[str, Any]:
+        """Evaluate indicator probes and error selectors in a single browser round trip"""
+        return await page.evaluate(PROBE_JS, {"probes": probes, "errorSelectors": error_selectors})
     
     async def _security_monitor(self, page, url: str) -> None:
         """Monitor for security threats and suspicious activity"""
         try:
-            # Check for Cloudflare protection
-            cloudflare_indicators = [
-                '[class*="cf-"]',
-                '[id*="cf-"]',
-                'text=Cloudflare',
-                'text=Please wait while we check your browser'
-            ]
+            found = (await self._probe_page(page, SECURITY_PROBES))["found"]
             
-            for indicator in cloudflare_indicators:
-                if await page.query_selector(indicator):
-                    security_alert = {
-                        "type": "cloudflare_detected",
-                        "url": url,
-                        "indicator": indicator,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    self.metrics["security_alerts"].append(security_alert)
-                    logger.warning("Cloudflare protection detected", indicator=indicator)
-                    break
+            # Check for Cloudflare protection
+            indicator = found["cloudflare"]
+            if indicator:
+                security_alert = SecurityAlert(
+                    type="cloudflare_detected",
+                    url=url,
+                    ts_ns=time.time_ns(),
+                    indicator=indicator,
+                )
+                self.metrics["security_alerts"].append(security_alert)
+                logger.warning("Cloudflare protection detected", indicator=indicator)
             
             # Check for rate limiting
-            rate_limit_indicators = [
-                '[class*="rate-limit"]',
-                '[class*="Rate-limit"]', 
-                'text=rate limit',
-                'text=too many requests'
-            ]
-            
-            for indicator in rate_limit_indicators:
-                if await page.query_selector(indicator):
-                    security_alert = {
-                        "type": "rate_limit_detected",
-                        "url": url,
-                        "indicator": indicator,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    self.metrics["security_alerts"].append(security_alert)
-                    logger.warning("Rate limiting detected", indicator=indicator)
-                    break
+            indicator = found["rate_limit"]
+            if indicator:
+                security_alert = SecurityAlert(
+                    type="rate_limit_detected",
+                    url=url,
+                    ts_ns=time.time_ns(),
+                    indicator=indicator,
+                )
+                self.metrics["security_alerts"].append(security_alert)
+                logger.warning("Rate limiting detected", indicator=indicator)
             
             # Check for authentication challenges
-            auth_indicators = [
-                'input[type="password"]',
-                'text=Sign in',
-                'text=Log in',
-                '[data-cy="login"]'
-            ]
-            
-            for indicator in auth_indicators:
-                if await page.query_selector(indicator):
-                    logger.info("Authentication page detected", indicator=indicator)
-                    break
+            indicator = found["auth"]
+            if indicator:
+                logger.info("Authentication page detected", indicator=indicator)
                     
         except Exception as e:
             logger.debug("Security monitoring failed", error=str(e))
     
-    async def _detect_and_handle_errors(self, page, agent: Agent) -> None:
+    async def _detect_and_handle_errors(self, page, agent: Agent, errors: List[Dict[str, str]]) -> None:
         """Detect and categorize Apollo.io errors"""
         try:
-            # Apollo-specific error selectors
-            error_selectors = [
-                '[data-cy="error-message"]',
-                '.error-banner',
-                '.alert-danger',
-                '[class*="error"]',
-                '[role="alert"]'
-            ]
-            
-            for selector in error_selectors:
-                error_elements = await page.query_selector_all(selector)
-                if error_elements:
-                    for element in error_elements:
-                        error_text = await element.text_content()
-                        if error_text and error_text.strip():
-                            self.metrics["errors_detected"] += 1
-                            
-                            logger.error("Apollo error detected", 
-                                       error_text=error_text.strip(),
-                                       selector=selector,
-                                       url=page.url)
-                            
-                            # Take error screenshot
-                            await self._capture_error_screenshot(page, error_text)
-                            break
+            # errors holds the first non-empty element text per ERROR_SELECTORS entry
+            step = self.metrics["steps_executed"]
+            for error in errors:
+                # A banner that stays visible is reported once, not on every step
+                digest = hashlib.blake2b(error["text"].encode("utf-8"), digest_size=8).digest()
+                last_step = self._seen_errors.get(digest)
+                if last_step is not None and step - last_step < ERROR_REPEAT_STEPS:
+                    self._seen_errors.move_to_end(digest)
+                    continue
+                self._seen_errors[digest] = step
+                self._seen_errors.move_to_end(digest)
+                if len(self._seen_errors) > MAX_SEEN_ERRORS:
+                    self._seen_errors.popitem(last=False)
+                
+                self.metrics["errors_detected"] += 1
+                
+                logger.error("Apollo error detected", 
+                           error_text=error["text"],
+                           selector=error["selector"],
+                           url=page.url)
+                
+                # Take error screenshot
+                await self._capture_error_screenshot(page, error["text"])
             
-            # Check for JavaScript errors in console
-            console_errors = await page.evaluate("""
-                () => {
-                    const errors = [];
-                    const originalError = console.error;
-                    console.error = function(...args) {
-                        errors.push(args.join(' '));
-                        originalError.apply(console, args);
-                    };
-                    return errors;
-                }
-            """)
+            # Drain console errors collected by the page listener since the last step
+            console_errors = list(self._console_errors)
+            self._console_errors.clear()
             
             if console_errors:
                 logger.warning("JavaScript console errors detected", 
@@ -323,50 +685,23 @@ class ApolloMonitoringSystem:
         except Exception as e:
             logger.debug("Error detection failed", error=str(e))
     
-    async def _validate_state_transitions(self, page) -> None:
+    async def _validate_state_transitions(self, page, current_state: Optional[str], found: Dict[str, Optional[str]]) -> None:
         """Validate expected Apollo.io state transitions"""
         try:
-            current_url = page.url
-            current_state = self._detect_apollo_state(current_url)
-            
             if not current_state:
                 return
             
             # Check for successful transitions
             if current_state == "filtered_search":
                 # Validate that search filters are applied
-                filter_indicators = [
-                    '[data-cy*="filter"]',
-                    '.filter-applied',
-                    '[class*="active-filter"]'
-                ]
-                
-                has_filters = False
-                for indicator in filter_indicators:
-                    if await page.query_selector(indicator):
-                        has_filters = True
-                        break
-                
-                if has_filters:
+                if found.get("filtered_search"):
                     logger.info("Search filters successfully applied")
                 else:
                     logger.warning("In filtered search state but no filter indicators found")
             
             elif current_state == "people_search":
                 # Validate search interface is loaded
-                search_indicators = [
-                    '[data-cy="search-results"]',
-                    '.search-results',
-                    '[class*="prospect"]'
-                ]
-                
-                has_search_ui = False
-                for indicator in search_indicators:
-                    if await page.query_selector(indicator):
-                        has_search_ui = True
-                        break
-                
-                if not has_search_ui:
+                if not found.get("people_search"):
                     logger.warning("In people search state but search UI not detected")
                     
         except Exception as e:
@@ -386,7 +721,7 @@ class ApolloMonitoringSystem:
             
             # Screenshot on important state transitions
             apollo_state = self._detect_apollo_state(current_url)
-            if apollo_state in ["filtered_search", "authentication_page"]:
+            if apollo_state in SCREENSHOT_STATES:
                 should_screenshot = True
                 screenshot_reason = f"state_{apollo_state}"
             
@@ -395,15 +730,13 @@ class ApolloMonitoringSystem:
                 should_screenshot = True
                 screenshot_reason = "security_alert"
             
-            if should_screenshot:
+            if should_screenshot and self._take_screenshot_token():
                 timestamp = int(time.time())
                 filename = f"apollo_{screenshot_reason}_{timestamp}.png"
                 screenshot_path = Path(f"screenshots/debug/{filename}")
                 
-                await page.screenshot(path=str(screenshot_path))
-                logger.info("Debug screenshot captured", 
-                           path=str(screenshot_path), 
-                           reason=screenshot_reason)
+                self._schedule_screenshot(page, screenshot_path, "Debug screenshot captured",
+                                          reason=screenshot_reason)
                            
         except Exception as e:
             logger.debug("Screenshot capture failed", error=str(e))
@@ -411,76 +744,103 @@ class ApolloMonitoringSystem:
     async def _capture_error_screenshot(self, page, error_text: str) -> None:
         """Capture screenshot specifically for errors"""
         try:
+            # The same error repeated across steps only needs one screenshot
+            now = time.monotonic()
+            error_key = hashlib.sha1(error_text.encode("utf-8")).hexdigest()
+            if now - self._error_shot_times.get(error_key, float("-inf")) < ERROR_SCREENSHOT_DEDUP_SECONDS:
+                return
+            if not self._take_screenshot_token():
+                return
+            self._error_shot_times[error_key] = now
+            self._error_shot_times.move_to_end(error_key)
+            if len(self._error_shot_times) > MAX_SEEN_ERRORS:
+                self._error_shot_times.popitem(last=False)
+            
             timestamp = int(time.time())
             # Sanitize error text for filename
             safe_error = "".join(c for c in error_text[:30] if c.isalnum() or c in "-_")
             filename = f"error_{safe_error}_{timestamp}.png"
             screenshot_path = Path(f"screenshots/debug/{filename}")
             
-            await page.screenshot(path=str(screenshot_path))
-            logger.info("Error screenshot captured", 
-                       path=str(screenshot_path), 
-                       error_preview=error_text[:50])
+            self._schedule_screenshot(page, screenshot_path, "Error screenshot captured",
+                                      error_preview=error_text[:50])
                        
         except Exception as e:
             logger.debug("Error screenshot failed", error=str(e))
     
-    async def _analyze_step_performance(self, page) -> None:
+    def _take_screenshot_token(self) -> bool:
+        """Spend one unit of the per-minute screenshot budget, if any is left"""
+        now = time.monotonic()
+        if now >= self._shot_reset:
+            self._shot_budget = SCREENSHOTS_PER_MINUTE
+            self._shot_reset = now + 60
+        if self._shot_budget <= 0:
+            return False
+        self._shot_budget -= 1
+        return True
+    
+    def _schedule_screenshot(self, page, path: Path, message: str, **fields) -> None:
+        """Capture in the background so the agent step is not held up by encoding"""
+        task = asyncio.create_task(self._do_screenshot(page, path, message, fields))
+        self._screenshot_tasks.add(task)
+        task.add_done_callback(self._screenshot_tasks.discard)
+    
+    async def _do_screenshot(self, page, path: Path, message: str, fields: Dict[str, Any]) -> None:
+        try:
+            await page.screenshot(path=str(path))
+            logger.info(message, path=str(path), **fields)
+        except Exception as e:
+            logger.debug("Screenshot capture failed", error=str(e))
+    
+    async def wait_for_screenshots(self) -> None:
+        """Wait for background screenshots to finish (call before closing the browser)"""
+        if self._screenshot_tasks:
+            await asyncio.gather(*self._screenshot_tasks, return_exceptions=True)
+    
+    async def close(self) -> str:
+        """
+        Session teardown: finish pending screenshots and save the report
+        
+        Await this before the browser closes, or in-flight screenshots are lost.
+        
+        Returns:
+            Path of the saved monitoring report
+        """
+        await self.wait_for_screenshots()
+        return self.save_monitoring_report()
+    
+    def _analyze_step_performance(self, url: str, perf: Dict[str, Any], emit_debug: bool = False) -> None:
         """Analyze performance metrics for current step"""
         try:
-            # Get performance timing data
-            timing_data = await page.evaluate("""
-                () => {
-                    const nav = performance.getEntriesByType('navigation')[0];
-                    const paint = performance.getEntriesByType('paint');
-                    
-                    return {
-                        navigation: nav ? {
-                            domContentLoaded: nav.domContentLoadedEventEnd - nav.navigationStart,
-                            loadComplete: nav.loadEventEnd - nav.navigationStart,
-                            firstByte: nav.responseStart - nav.navigationStart
-                        } : null,
-                        paint: paint.reduce((acc, entry) => {
-                            acc[entry.name] = entry.startTime;
-                            return acc;
-                        }, {})
-                    };
+            nav = perf["navigation"]
+            if nav:
+                nav_timing = {
+                    "domContentLoaded": nav["domContentLoadedEventEnd"] - nav["startTime"],
+                    "loadComplete": nav["loadEventEnd"] - nav["startTime"],
+                    "firstByte": nav["responseStart"] - nav["startTime"],
                 }
-            """)
-            
-            if timing_data["navigation"]:
-                nav_timing = timing_data["navigation"]
                 
                 # Log slow page loads
-                if nav_timing["loadComplete"] > 10000:  # > 10 seconds
+                if nav_timing["loadComplete"] > SLOW_LOAD_MS:
                     logger.warning("Slow page load detected", 
                                  load_time=nav_timing["loadComplete"],
-                                 url=page.url)
+                                 url=url)
                 
                 # Log performance data
-                logger.debug("Performance timing", 
-                           dom_ready=nav_timing["domContentLoaded"],
-                           load_complete=nav_timing["loadComplete"],
-                           first_byte=nav_timing["firstByte"])
+                if emit_debug:
+                    logger.debug("Performance timing", 
+                               dom_ready=nav_timing["domContentLoaded"],
+                               load_complete=nav_timing["loadComplete"],
+                               first_byte=nav_timing["firstByte"],
+                               paint=perf["paint"])
                            
         except Exception as e:
             logger.debug("Performance analysis failed", error=str(e))
     
-    async def _monitor_memory_usage(self, page) -> None:
+    def _monitor_memory_usage(self, perf: Dict[str, Any], emit_debug: bool = False) -> None:
         """Monitor browser memory usage if available"""
         try:
-            memory_info = await page.evaluate("""
-                () => {
-                    if ('memory' in performance) {
-                        return {
-                            used: performance.memory.usedJSHeapSize,
-                            total: performance.memory.totalJSHeapSize,
-                            limit: performance.memory.jsHeapSizeLimit
-                        };
-                    }
-                    return null;
-                }
-            """)
+            memory_info = perf["memory"]
             
             if memory_info:
                 used_mb = memory_info["used"] / 1024 / 1024
@@ -492,9 +852,10 @@ class ApolloMonitoringSystem:
                                  used_mb=round(used_mb, 2),
                                  total_mb=round(total_mb, 2))
                 
-                logger.debug("Memory usage", 
-                           used_mb=round(used_mb, 2),
-                           total_mb=round(total_mb, 2))
+                if emit_debug:
+                    logger.debug("Memory usage", 
+                               used_mb=round(used_mb, 2),
+                               total_mb=round(total_mb, 2))
                            
         except Exception as e:
             logger.debug("Memory monitoring failed", error=str(e))
@@ -515,20 +876,19 @@ class ApolloMonitoringSystem:
             "apollo_states": self.metrics["apollo_states_encountered"],
             "navigation_summary": {
                 "unique_pages": list(self.metrics["pages_visited"]),
-                "navigation_history": self.metrics["navigation_history"][-10:]  # Last 10
+                "navigation_history": [entry.to_dict() for entry in self.metrics["navigation_history"]]  # Last 10
             },
             "performance_summary": {
                 "avg_steps_per_minute": self.metrics["steps_executed"] / (session_duration / 60) if session_duration > 0 else 0,
-                "performance_issues": [
-                    p for p in self.metrics["performance_data"] 
-                    if p.get("load_complete", 0) > 10000
-                ]
+                "slowest_load_ms": self.metrics["slowest_load_ms"],
+                "performance_issues": list(self.metrics["performance_issues"]),
+                "events_file": str(MONITORING_EVENTS_FILE)
             },
             "security_summary": {
-                "alerts": self.metrics["security_alerts"],
+                "alerts": [alert.to_dict() for alert in self.metrics["security_alerts"]],
                 "unauthorized_navigations": [
-                    alert for alert in self.metrics["security_alerts"] 
-                    if alert["type"] == "unauthorized_navigation"
+                    alert.to_dict() for alert in self.metrics["security_alerts"] 
+                    if alert.type == "unauthorized_navigation"
                 ]
             }
         }
@@ -541,20 +901,20 @@ class ApolloMonitoringSystem:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = Path(f"reports/performance/apollo_monitoring_{timestamp}.json")
         
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2, default=str)
+        report_path.write_bytes(json_dumps(report, indent=True, default=str))
         
         logger.info("Monitoring report saved", path=str(report_path))
         return str(report_path)
 
 
 # Factory function to create monitoring hooks
-def create_apollo_monitoring_hooks():
+def create_apollo_monitoring_hooks(watch_thresholds: bool = True):
     """Create monitoring system and return hook functions"""
-    monitoring = ApolloMonitoringSystem()
+    monitoring = ApolloMonitoringSystem(watch_thresholds=watch_thresholds)
     
     return {
         "step_start": monitoring.step_start_monitor,
         "step_end": monitoring.step_end_monitor,
+        "session_end": monitoring.close,
         "monitoring_system": monitoring
     }
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Shared JSON encoding for Apollo.io automation
+Uses orjson when installed (pip install orjson) and falls back to stdlib json
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+# Optional faster JSON backend - graceful fallback to stdlib json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def json_dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with a 2-space indent
+        default: Fallback for values JSON can't represent (e.g. str)
+    """
+    if HAS_ORJSON:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=default).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON from bytes or str"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["HAS_ORJSON", "json_dumps", "json_loads"]